@@ -1,26 +1,11 @@
-import streamlit as st
-import pandas as pd
-import geopandas as gpd
-import folium
-from streamlit_folium import folium_static
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
-from datetime import datetime
 import hashlib
-import networkx as nx
-from sklearn.ensemble import RandomForestClassifier, IsolationForest
-from sklearn.preprocessing import StandardScaler
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.svm import SVC
-from sklearn.metrics import confusion_matrix, classification_report
-import matplotlib.pyplot as plt
-from pyvis.network import Network
-import streamlit.components.v1 as components
-import os
-import json
-import requests
-from PIL import Image
+
+import streamlit as st
+
+# Only streamlit is imported up front, so the login page starts without the
+# analysis stack. Each page imports what it uses when it is first shown;
+# `python benchmarks.py startup importtime` reports what a cold start of each
+# page loads and how long the imports take.
 
 # Set page configuration
 st.set_page_config(layout="wide", page_title="Deteksi Pencucian Uang di Sektor Pertambangan")
@@ -46,186 +31,6 @@ def logout():
     st.session_state['username'] = None
     st.rerun()
 
-# Sample data generation function
-def load_sample_data():
-    # Sample mining locations
-    mining_locations = pd.DataFrame({
-        'id': range(1, 11),
-        'name': [f'Tambang {i}' for i in range(1, 11)],
-        'district': ['Kabupaten A', 'Kabupaten B', 'Kabupaten C', 'Kabupaten D', 'Kabupaten E'] * 2,
-        'province': ['Provinsi X'] * 5 + ['Provinsi Y'] * 5,
-        'company': [f'PT Mining {chr(65+i)}' for i in range(10)],
-        'license_type': ['IUP', 'IUPK', 'IUP', 'IUPK', 'IUP'] * 2,
-        'commodity': ['Batubara', 'Emas', 'Tembaga', 'Nikel', 'Besi'] * 2,
-        'area_2020': [1000, 1500, 1200, 2000, 1800, 1100, 1600, 1300, 1900, 1700],
-        'area_2023': [1200, 1800, 1400, 2500, 2200, 1300, 1900, 1500, 2300, 2000],
-        'land_change_anomaly': [0.2, 0.5, 0.3, 0.7, 0.6, 0.25, 0.45, 0.35, 0.65, 0.55],
-        'lat': [-2.0, -2.5, -3.0, -3.5, -4.0, -2.2, -2.7, -3.2, -3.7, -4.2],
-        'lon': [120.0, 120.5, 121.0, 121.5, 122.0, 120.2, 120.7, 121.2, 121.7, 122.2]
-    })
-
-    # Sample financial data
-    financial_data = pd.DataFrame({
-        'mine_id': range(1, 11),
-        'reported_revenue': [1e9, 2e9, 1.5e9, 3e9, 2.5e9, 1.2e9, 2.2e9, 1.7e9, 2.8e9, 2.3e9],
-        'estimated_production': [10000, 15000, 12000, 20000, 18000, 11000, 16000, 13000, 19000, 17000],
-        'estimated_revenue': [1.2e9, 2.5e9, 1.8e9, 3.5e9, 3e9, 1.4e9, 2.7e9, 2e9, 3.3e9, 2.8e9],
-        'tax_paid': [1e8, 2e8, 1.5e8, 3e8, 2.5e8, 1.2e8, 2.2e8, 1.7e8, 2.8e8, 2.3e8],
-        'suspicious_score': [0.2, 0.5, 0.3, 0.7, 0.6, 0.25, 0.45, 0.35, 0.65, 0.55]
-    })
-
-    # Sample officials
-    officials = pd.DataFrame({
-        'id': range(1, 21),
-        'name': [f'Pejabat {i}' for i in range(1, 21)],
-        'position': ['Kepala Dinas', 'Bupati', 'Sekretaris', 'Anggota DPRD', 'Kepala Bidang'] * 4,
-        'district': ['Kabupaten A', 'Kabupaten B', 'Kabupaten C', 'Kabupaten D', 'Kabupaten E'] * 4,
-        'connected_mine_id': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10] * 2,
-        'connection_type': ['Pemilik', 'Investor', 'Konsultan', 'Tidak Ada', 'Pemegang Saham'] * 4,
-        'risk_score': [0.3, 0.6, 0.4, 0.7, 0.5, 0.35, 0.65, 0.45, 0.75, 0.55] * 2
-    })
-
-    # Sample transactions
-    transactions = []
-    for i in range(100):
-        official = officials.iloc[np.random.randint(0, len(officials))]
-        date = pd.Timestamp('2022-01-01') + pd.Timedelta(days=np.random.randint(0, 730))
-        risk_score = official['risk_score']
-        is_suspicious = np.random.random() < risk_score
-
-        if np.random.random() < 0.3:
-            amount = np.random.choice([99000, 99900, 99990])
-        else:
-            amount = np.random.randint(5000, 100000)
-
-        transaction_type = np.random.choice(
-            ['Bank Transfer', 'E-Wallet', 'Cash Deposit', 'Property Purchase', 'Investment', 'Offshore Transfer'],
-            p=[0.3, 0.2, 0.2, 0.1, 0.1, 0.1]
-        )
-
-        if transaction_type == 'Offshore Transfer' and is_suspicious:
-            counterparty = np.random.choice(['Singapore Account', 'Hong Kong Account', 'Cayman Islands LLC'])
-        elif transaction_type == 'Property Purchase' and is_suspicious:
-            counterparty = 'Property Agent'
-        elif transaction_type == 'Investment' and is_suspicious:
-            counterparty = np.random.choice(['Mining Company', 'Shell Corporation', 'Family Business'])
-        else:
-            counterparty = np.random.choice(['Personal Account', 'Family Member', 'Local Business', 'Government Account'])
-
-        frequency_pattern = np.random.random()
-        structuring_pattern = np.random.random() if is_suspicious else np.random.random() * 0.3
-        unusual_pattern = np.random.random() if is_suspicious else np.random.random() * 0.2
-
-        ml_score = (frequency_pattern + structuring_pattern + unusual_pattern) / 3 * 0.7 + risk_score * 0.3
-        flag = 'Suspicious' if ml_score > 0.6 or is_suspicious else 'Normal'
-
-        transactions.append({
-            'date': date,
-            'official_id': official['id'],
-            'official_name': official['name'],
-            'position': official['position'],
-            'district': official['district'],
-            'amount': amount,
-            'transaction_type': transaction_type,
-            'counterparty': counterparty,
-            'frequency_pattern': frequency_pattern,
-            'structuring_pattern': structuring_pattern,
-            'unusual_pattern': unusual_pattern,
-            'ml_score': ml_score,
-            'flag': flag,
-            'connected_mine_id': official['connected_mine_id']
-        })
-
-    transactions_df = pd.DataFrame(transactions)
-
-    # Sample connections
-    connections = []
-    for i in range(len(officials)):
-        for j in range(i + 1, len(officials)):
-            if officials.iloc[i]['district'] == officials.iloc[j]['district']:
-                if np.random.random() < 0.7:
-                    connections.append({
-                        'source': officials.iloc[i]['name'],
-                        'target': officials.iloc[j]['name'],
-                        'weight': np.random.uniform(0.5, 1.0),
-                        'type': 'Official-Official',
-                        'description': 'Kolega di pemerintahan daerah'
-                    })
-            elif officials.iloc[i]['connected_mine_id'] == officials.iloc[j]['connected_mine_id']:
-                if np.random.random() < 0.8:
-                    connections.append({
-                        'source': officials.iloc[i]['name'],
-                        'target': officials.iloc[j]['name'],
-                        'weight': np.random.uniform(0.6, 1.0),
-                        'type': 'Official-Mine',
-                        'description': 'Terlibat di tambang yang sama'
-                    })
-            else:
-                if np.random.random() < 0.2:
-                    connections.append({
-                        'source': officials.iloc[i]['name'],
-                        'target': officials.iloc[j]['name'],
-                        'weight': np.random.uniform(0.1, 0.5),
-                        'type': 'Official-Official',
-                        'description': 'Koneksi umum'
-                    })
-
-    for i in range(len(officials)):
-        mine_id = officials.iloc[i]['connected_mine_id']
-        mine = mining_locations[mining_locations['id'] == mine_id].iloc[0]
-        if officials.iloc[i]['connection_type'] != 'Tidak Ada':
-            connections.append({
-                'source': officials.iloc[i]['name'],
-                'target': mine['company'],
-                'weight': officials.iloc[i]['risk_score'],
-                'type': 'Official-Company',
-                'description': f"Koneksi {officials.iloc[i]['connection_type'].lower()}"
-            })
-
-    connections_df = pd.DataFrame(connections)
-
-    # Land change analysis
-    land_change = pd.DataFrame({
-        'mine_id': mining_locations['id'],
-        'name': mining_locations['name'],
-        'district': mining_locations['district'],
-        'area_2020': mining_locations['area_2020'],
-        'area_2021': [round(mining_locations['area_2020'][i] + (mining_locations['area_2023'][i] - mining_locations['area_2020'][i]) * 0.3) for i in range(len(mining_locations))],
-        'area_2022': [round(mining_locations['area_2020'][i] + (mining_locations['area_2023'][i] - mining_locations['area_2020'][i]) * 0.7) for i in range(len(mining_locations))],
-        'area_2023': mining_locations['area_2023'],
-        'percent_change': [(mining_locations['area_2023'][i] - mining_locations['area_2020'][i]) / mining_locations['area_2020'][i] * 100 for i in range(len(mining_locations))],
-        'anomaly_score': mining_locations['land_change_anomaly'],
-        'deforestation_impact': [round(np.random.uniform(0.5, 0.9) * (mining_locations['area_2023'][i] - mining_locations['area_2020'][i])) for i in range(len(mining_locations))],
-        'water_impact': [round(np.random.uniform(0.3, 0.7) * (mining_locations['area_2023'][i] - mining_locations['area_2020'][i])) for i in range(len(mining_locations))],
-        'license_compliance': [np.random.choice(['Sesuai', 'Tidak Sesuai', 'Perlu Verifikasi'], p=[0.4, 0.3, 0.3]) for _ in range(len(mining_locations))]
-    })
-
-    # Integrated risk assessment
-    integrated_risk = pd.DataFrame({
-        'mine_id': mining_locations['id'],
-        'mine_name': mining_locations['name'],
-        'district': mining_locations['district'],
-        'land_change_risk': mining_locations['land_change_anomaly'],
-        'financial_risk': financial_data['suspicious_score'],
-        'official_risk': [officials[officials['connected_mine_id'] == mine_id]['risk_score'].mean() for mine_id in mining_locations['id']],
-        'transaction_risk': [transactions_df[transactions_df['connected_mine_id'] == mine_id]['ml_score'].mean() for mine_id in mining_locations['id']],
-    })
-
-    integrated_risk['integrated_risk_score'] = (
-        integrated_risk['land_change_risk'] * 0.25 +
-        integrated_risk['financial_risk'] * 0.25 +
-        integrated_risk['official_risk'] * 0.25 +
-        integrated_risk['transaction_risk'] * 0.25
-    )
-
-    integrated_risk['risk_category'] = pd.cut(
-        integrated_risk['integrated_risk_score'],
-        bins=[0, 0.3, 0.6, 1.0],
-        labels=['Rendah', 'Sedang', 'Tinggi']
-    )
-
-    return mining_locations, financial_data, officials, transactions_df, connections_df, land_change, integrated_risk
-
 # Login page
 def login_page():
     st.title("Login - Sistem Deteksi Pencucian Uang di Sektor Pertambangan")
@@ -261,34 +66,27 @@ def login_page():
 
 # Main application
 def main_app():
-    # Load data once
-    mining_data, financial_data, officials, transactions, connections, land_change, integrated_risk = load_sample_data()
-
-    # Create GeoJSON structure
-    mining_geojson = {
-        "type": "FeatureCollection",
-        "features": [
-            {
-                "type": "Feature",
-                "properties": {
-                    "id": row['id'],
-                    "name": row['name'],
-                    "district": row['district'],
-                    "province": row['province'],
-                    "company": row['company'],
-                    "license_type": row['license_type'],
-                    "commodity": row['commodity'],
-                    "area_2020": row['area_2020'],
-                    "area_2023": row['area_2023'],
-                    "land_change_anomaly": row['land_change_anomaly']
-                },
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [row['lon'], row['lat']]
-                }
-            } for _, row in mining_data.iterrows()
-        ]
-    }
+    import pandas as pd
+    from data import get_data, invalidate_data_cache, data_version
+
+    # Pages get shallow copies of the cached frames (data.get_data); with
+    # copy-on-write their writes land in their own copy, never in the shared
+    # cache. Set here, by the app, rather than on importing data.
+    pd.set_option('mode.copy_on_write', True)
+    from ingest import live_transactions
+    from models import get_model, transaction_training_frame
+
+    # Load data from the shared cache (built once per source/version, not per rerun)
+    mining_data, financial_data, officials, transactions, connections, land_change, integrated_risk = get_data()
+    # The transaction classifier, trained on the loaded transactions (the frame
+    # is only built when the model is not loaded yet), flags them and every row
+    # streamed into the store since, so all pages show its flags. Its scorer
+    # form loads without scikit-learn.
+    loaded_transactions = transactions
+    transaction_frame = lambda: transaction_training_frame(loaded_transactions, officials)
+    scorer, scorer_meta = get_model('transaction_scorer', data_version(), transaction_frame)
+    live = live_transactions(f"{data_version()}|{scorer_meta['revision']}", transactions, officials, scorer).refresh()
+    transactions = live.frame
 
     # Sidebar navigation
     with st.sidebar:
@@ -299,9 +97,18 @@ def main_app():
             "Deteksi Transaksi Mencurigakan",
             "Analisis Jaringan Sosial",
             "Integrasi & Prediksi"
-        ])
+        ], key='page')
         if st.button("Logout"):
             logout()
+        if st.button("Periksa Transaksi Baru"):
+            st.rerun()
+        if live.streamed:
+            st.caption(f"{live.streamed:,} transaksi masuk melalui ingestion")
+        if st.button("Muat Ulang Data"):
+            from maps import map_html_cache
+            invalidate_data_cache()
+            map_html_cache.clear()
+            st.rerun()
         st.success(f"Login sebagai: {st.session_state['username']}")
         st.markdown("---")
         st.markdown("### Didukung oleh:")
@@ -309,6 +116,18 @@ def main_app():
 
     # Dashboard Utama
     if page == "Dashboard Utama":
+        import folium
+        import plotly.express as px
+        from geo import (
+            load_concessions, mine_concessions, concession_footprints, tolerance_for_zoom,
+            concession_viewport_provider, concessions_version
+        )
+        from maps import (
+            ViewportGeoJson, VIEWPORT_MODE_THRESHOLD, RISK_POPUP_TEMPLATE, cached_risk_points, add_risk_markers,
+            serve_viewport_layer, serve_provider_layer, cached_map_html, show_map_html
+        )
+        from tile_server import tile_server_enabled
+
         st.title("Dashboard Deteksi Pencucian Uang di Sektor Pertambangan")
         st.markdown("""
         Dashboard ini mengintegrasikan analisis perubahan lahan, transaksi keuangan, dan jaringan sosial
@@ -322,8 +141,9 @@ def main_app():
             high_risk_count = len(integrated_risk[integrated_risk['risk_category'] == 'Tinggi'])
             st.metric("Lokasi Risiko Tinggi", f"{high_risk_count}", f"{high_risk_count/len(integrated_risk)*100:.1f}%")
         with col2:
-            suspicious_transactions = len(transactions[transactions['flag'] == 'Suspicious'])
-            st.metric("Transaksi Mencurigakan", f"{suspicious_transactions}", f"{suspicious_transactions/len(transactions)*100:.1f}%")
+            transaction_counts = live.cube.cells.groupby('flag')['count'].sum()
+            suspicious_transactions = int(transaction_counts.get('Suspicious', 0))
+            st.metric("Transaksi Mencurigakan", f"{suspicious_transactions}", f"{suspicious_transactions/transaction_counts.sum()*100:.1f}%")
         with col3:
             high_risk_officials = len(officials[officials['risk_score'] > 0.6])
             st.metric("Pejabat Berisiko Tinggi", f"{high_risk_officials}", f"{high_risk_officials/len(officials)*100:.1f}%")
@@ -333,62 +153,66 @@ def main_app():
 
         # Map visualization
         st.subheader("Peta Risiko Terintegrasi")
-        m = folium.Map(location=[-2.5, 120], zoom_start=5, tiles="CartoDB positron")
-        for _, row in integrated_risk.iterrows():
-            mine_info = mining_data[mining_data['id'] == row['mine_id']].iloc[0]
-            color = {'Tinggi': 'red', 'Sedang': 'orange', 'Rendah': 'green'}[row['risk_category']]
-            popup_content = f"""
-            <div style="width: 300px; font-family: Arial;">
-                <h4 style="color: #333;">{mine_info['name']} ({mine_info['commodity']})</h4>
-                <p><b>Kabupaten:</b> {mine_info['district']}</p>
-                <p><b>Perusahaan:</b> {mine_info['company']}</p>
-                <p><b>Izin:</b> {mine_info['license_type']}</p>
-                <p><b>Perubahan Lahan:</b> {land_change[land_change['mine_id'] == row['mine_id']]['percent_change'].values[0]:.1f}%</p>
-                <p><b>Skor Risiko:</b> {row['integrated_risk_score']:.2f} ({row['risk_category']})</p>
-                <hr>
-                <p><b>Risiko Perubahan Lahan:</b> {row['land_change_risk']:.2f}</p>
-                <p><b>Risiko Keuangan:</b> {row['financial_risk']:.2f}</p>
-                <p><b>Risiko Pejabat:</b> {row['official_risk']:.2f}</p>
-                <p><b>Risiko Transaksi:</b> {row['transaction_risk']:.2f}</p>
-            </div>
-            """
-            folium.CircleMarker(
-                location=[mine_info['lat'], mine_info['lon']],
-                radius=15,
-                color=color,
-                fill=True,
-                fill_color=color,
-                fill_opacity=0.7,
-                popup=folium.Popup(popup_content, max_width=350)
-            ).add_to(m)
-            folium.Marker(
-                location=[mine_info['lat'], mine_info['lon']],
-                icon=folium.DivIcon(
-                    icon_size=(100, 20),
-                    icon_anchor=(50, 0),
-                    html=f'<div style="font-size: 10pt; color: black; background-color: white; border-radius: 3px; padding: 2px 5px; opacity: 0.8;">{mine_info["name"]}</div>'
+        footprints = mine_concessions(data_version(), mining_data)
+        viewport_mode = tile_server_enabled() and st.toggle(
+            "Muat fitur sesuai tampilan peta",
+            value=len(integrated_risk) > VIEWPORT_MODE_THRESHOLD,
+            help="Hanya tambang dan poligon konsesi di area peta yang terlihat yang dikirim ke browser.",
+            key="dashboard_viewport_mode"
+        )
+        viewport_urls = None
+        if viewport_mode:
+            viewport_urls = (
+                serve_provider_layer("concessions", concessions_version(), concession_viewport_provider),
+                serve_viewport_layer(
+                    "risk-points", data_version(),
+                    lambda: cached_risk_points(data_version(), integrated_risk, mining_data, land_change, footprints)
                 )
-            ).add_to(m)
-
-        legend_html = """
-        <div style="position: fixed; bottom: 50px; left: 50px; z-index: 1000; background-color: white; padding: 10px; border-radius: 5px; box-shadow: 0 0 5px rgba(0,0,0,0.3);">
-            <p><b>Kategori Risiko:</b></p>
-            <div style="display: flex; align-items: center; margin-bottom: 5px;">
-                <div style="width: 15px; height: 15px; border-radius: 50%; background-color: red; margin-right: 5px;"></div>
-                <span>Tinggi</span>
-            </div>
-            <div style="display: flex; align-items: center; margin-bottom: 5px;">
-                <div style="width: 15px; height: 15px; border-radius: 50%; background-color: orange; margin-right: 5px;"></div>
-                <span>Sedang</span>
-            </div>
-            <div style="display: flex; align-items: center;">
-                <div style="width: 15px; height: 15px; border-radius: 50%; background-color: green; margin-right: 5px;"></div>
-                <span>Rendah</span>
+            )
+
+        def build_risk_map():
+            m = folium.Map(location=[-2.5, 120], zoom_start=5, tiles="CartoDB positron")
+            if viewport_urls:
+                concessions_url, points_url = viewport_urls
+                ViewportGeoJson(concessions_url, tooltip_field='AREA').add_to(m)
+                ViewportGeoJson(points_url, popup_template=RISK_POPUP_TEMPLATE, tooltip_field='name').add_to(m)
+            else:
+                # Only the polygons some mine was matched to; there may be none
+                polygons = concession_footprints(load_concessions(tolerance=tolerance_for_zoom(5)), footprints)
+                if len(polygons):
+                    folium.GeoJson(
+                        polygons,
+                        name="Konsesi",
+                        style_function=lambda feature: {'color': '#34495e', 'weight': 1, 'fillOpacity': 0.2},
+                        tooltip=folium.GeoJsonTooltip(fields=['fid', 'AREA'], aliases=['ID Konsesi', 'Luas (km²)'])
+                    ).add_to(m)
+                add_risk_markers(m, cached_risk_points(data_version(), integrated_risk, mining_data, land_change, footprints))
+
+            legend_html = """
+            <div style="position: fixed; bottom: 50px; left: 50px; z-index: 1000; background-color: white; padding: 10px; border-radius: 5px; box-shadow: 0 0 5px rgba(0,0,0,0.3);">
+                <p><b>Kategori Risiko:</b></p>
+                <div style="display: flex; align-items: center; margin-bottom: 5px;">
+                    <div style="width: 15px; height: 15px; border-radius: 50%; background-color: red; margin-right: 5px;"></div>
+                    <span>Tinggi</span>
+                </div>
+                <div style="display: flex; align-items: center; margin-bottom: 5px;">
+                    <div style="width: 15px; height: 15px; border-radius: 50%; background-color: orange; margin-right: 5px;"></div>
+                    <span>Sedang</span>
+                </div>
+                <div style="display: flex; align-items: center;">
+                    <div style="width: 15px; height: 15px; border-radius: 50%; background-color: green; margin-right: 5px;"></div>
+                    <span>Rendah</span>
+                </div>
             </div>
-        </div>
-        """
-        m.get_root().html.add_child(folium.Element(legend_html))
-        folium_static(m, width=1200, height=500)
+            """
+            m.get_root().html.add_child(folium.Element(legend_html))
+            return m
+
+        map_html = cached_map_html(
+            "Dashboard Utama", None, f"{data_version()}|{concessions_version()}",
+            build_risk_map, variant=viewport_urls
+        )
+        show_map_html(map_html, width=1200, height=500)
 
         # Risk distribution
         st.subheader("Distribusi Risiko")
@@ -418,7 +242,7 @@ def main_app():
 
         # Recent suspicious transactions
         st.subheader("Transaksi Mencurigakan Terbaru")
-        recent_suspicious = transactions[transactions['flag'] == 'Suspicious'].sort_values('date', ascending=False).head(5)
+        recent_suspicious = live.recent_suspicious.head(5)
         for _, tx in recent_suspicious.iterrows():
             with st.expander(f"{tx['official_name']} - Rp {tx['amount']:,.0f} - {tx['date'].strftime('%d %b %Y')}"):
                 st.markdown(f"""
@@ -445,6 +269,19 @@ def main_app():
 
     # Analisis Perubahan Lahan
     elif page == "Analisis Perubahan Lahan":
+        import folium
+        import plotly.express as px
+        from geo import (
+            load_concessions, mine_concessions, concession_footprints, tolerance_for_zoom,
+            concession_viewport_provider, concessions_version
+        )
+        from maps import (
+            ViewportGeoJson, VIEWPORT_MODE_THRESHOLD, format_concession_area, serve_provider_layer, cached_map_html,
+            show_map_html
+        )
+        from tile_server import tile_server_enabled
+        from models import get_model, ANOMALY_FEATURES
+
         st.title("Analisis Perubahan Lahan")
         st.markdown("""
         Halaman ini menampilkan analisis perubahan lahan pada lokasi tambang yang berpotensi
@@ -456,9 +293,6 @@ def main_app():
         col1, col2 = st.columns([3, 1])
 
         with col1:
-            # Create base map
-            m = folium.Map(location=[-2.5, 120], zoom_start=5, tiles="CartoDB positron")
-            
             # Add time slider control
             year_options = {
                 '2020': 'area_2020',
@@ -474,88 +308,124 @@ def main_app():
             )
             
             area_column = year_options[selected_year]
-            
-            # Create choropleth map for selected year
-            for _, row in land_change.iterrows():
-                mine_info = mining_data[mining_data['id'] == row['mine_id']].iloc[0]
+            footprints = mine_concessions(data_version(), mining_data)
+            viewport_mode = tile_server_enabled() and st.toggle(
+                "Muat poligon konsesi sesuai tampilan peta",
+                value=len(land_change) > VIEWPORT_MODE_THRESHOLD,
+                help="Hanya poligon konsesi di area peta yang terlihat yang dikirim ke browser.",
+                key="land_change_viewport_mode"
+            )
+            concessions_url = serve_provider_layer("concessions", concessions_version(), concession_viewport_provider) if viewport_mode else None
+
+            def build_land_change_map():
+                # Create base map
+                m = folium.Map(location=[-2.5, 120], zoom_start=5, tiles="CartoDB positron")
+                if concessions_url:
+                    ViewportGeoJson(concessions_url, tooltip_field='AREA').add_to(m)
+                else:
+                    polygons = concession_footprints(load_concessions(tolerance=tolerance_for_zoom(5)), footprints)
+                    if len(polygons):
+                        folium.GeoJson(
+                            polygons,
+                            name="Konsesi",
+                            style_function=lambda feature: {'color': '#34495e', 'weight': 1, 'fillOpacity': 0.2},
+                            tooltip=folium.GeoJsonTooltip(fields=['fid', 'AREA'], aliases=['ID Konsesi', 'Luas (km²)'])
+                        ).add_to(m)
+                concession = footprints.set_index('mine_id')
+                concession_area = format_concession_area(concession['concession_area'])
+                concession_match = concession['concession_match'].fillna('-')
+                
+                # Mines indexed once; each row is a hash lookup instead of a scan
+                mines = mining_data.set_index('id')
+
+                # Create choropleth map for selected year
+                for _, row in land_change.iterrows():
+                    mine_info = mines.loc[row['mine_id']]
                 
-                # Calculate radius based on area for the selected year
-                area_value = row[area_column]
-                radius = max(5, min(25, area_value / 50))  # Scale radius based on area
+                    # Calculate radius based on area for the selected year
+                    area_value = row[area_column]
+                    radius = max(5, min(25, area_value / 50))  # Scale radius based on area
                 
-                # Determine color based on growth rate compared to 2020
-                if selected_year != '2020':
-                    growth_rate = (row[area_column] - row['area_2020']) / row['area_2020'] * 100
-                    if growth_rate > 50:
-                        color = 'red'
-                    elif growth_rate > 20:
-                        color = 'orange'
+                    # Determine color based on growth rate compared to 2020
+                    if selected_year != '2020':
+                        growth_rate = (row[area_column] - row['area_2020']) / row['area_2020'] * 100
+                        if growth_rate > 50:
+                            color = 'red'
+                        elif growth_rate > 20:
+                            color = 'orange'
+                        else:
+                            color = 'green'
                     else:
-                        color = 'green'
-                else:
-                    color = 'blue'  # Base year
+                        color = 'blue'  # Base year
                 
-                # Create popup content
-                popup_content = f"""
-                <div style="width: 300px; font-family: Arial;">
-                    <h4 style="color: #333;">{mine_info['name']} ({mine_info['commodity']})</h4>
-                    <p><b>Kabupaten:</b> {mine_info['district']}</p>
-                    <p><b>Perusahaan:</b> {mine_info['company']}</p>
-                    <p><b>Luas {selected_year}:</b> {area_value} ha</p>
-                    {f"<p><b>Perubahan dari 2020:</b> {growth_rate:.1f}%</p>" if selected_year != '2020' else ""}
-                    <p><b>Kepatuhan Izin:</b> {row['license_compliance']}</p>
-                    <p><b>Dampak Deforestasi:</b> {row['deforestation_impact']} ha</p>
-                </div>
-                """
+                    # Create popup content
+                    popup_content = f"""
+                    <div style="width: 300px; font-family: Arial;">
+                        <h4 style="color: #333;">{mine_info['name']} ({mine_info['commodity']})</h4>
+                        <p><b>Kabupaten:</b> {mine_info['district']}</p>
+                        <p><b>Perusahaan:</b> {mine_info['company']}</p>
+                        <p><b>Luas {selected_year}:</b> {area_value} ha</p>
+                        <p><b>Konsesi:</b> {concession_match[row['mine_id']]}</p>
+                        <p><b>Luas Konsesi:</b> {concession_area[row['mine_id']]}</p>
+                        {f"<p><b>Perubahan dari 2020:</b> {growth_rate:.1f}%</p>" if selected_year != '2020' else ""}
+                        <p><b>Kepatuhan Izin:</b> {row['license_compliance']}</p>
+                        <p><b>Dampak Deforestasi:</b> {row['deforestation_impact']} ha</p>
+                    </div>
+                    """
                 
-                # Add circle marker
-                folium.CircleMarker(
-                    location=[mine_info['lat'], mine_info['lon']],
-                    radius=radius,
-                    color=color,
-                    fill=True,
-                    fill_color=color,
-                    fill_opacity=0.7,
-                    popup=folium.Popup(popup_content, max_width=350)
-                ).add_to(m)
+                    # Add circle marker
+                    folium.CircleMarker(
+                        location=[mine_info['lat'], mine_info['lon']],
+                        radius=radius,
+                        color=color,
+                        fill=True,
+                        fill_color=color,
+                        fill_opacity=0.7,
+                        popup=folium.Popup(popup_content, max_width=350)
+                    ).add_to(m)
                 
-                # Add label
-                folium.Marker(
-                    location=[mine_info['lat'], mine_info['lon']],
-                    icon=folium.DivIcon(
-                        icon_size=(100, 20),
-                        icon_anchor=(50, 0),
-                        html=f'<div style="font-size: 10pt; color: black; text-align: center;">{mine_info["name"]}</div>'
-                    )
-                ).add_to(m)
+                    # Add label
+                    folium.Marker(
+                        location=[mine_info['lat'], mine_info['lon']],
+                        icon=folium.DivIcon(
+                            icon_size=(100, 20),
+                            icon_anchor=(50, 0),
+                            html=f'<div style="font-size: 10pt; color: black; text-align: center;">{mine_info["name"]}</div>'
+                        )
+                    ).add_to(m)
             
-            # Add legend
-            legend_html = """
-            <div style="position: fixed; bottom: 50px; left: 50px; z-index: 1000; background-color: white; padding: 10px; border-radius: 5px; box-shadow: 0 0 5px rgba(0,0,0,0.3);">
-                <p><b>Perubahan Lahan:</b></p>
-                <div style="display: flex; align-items: center; margin-bottom: 5px;">
-                    <div style="width: 15px; height: 15px; border-radius: 50%; background-color: red; margin-right: 5px;"></div>
-                    <span>Perubahan Tinggi (>50%)</span>
-                </div>
-                <div style="display: flex; align-items: center; margin-bottom: 5px;">
-                    <div style="width: 15px; height: 15px; border-radius: 50%; background-color: orange; margin-right: 5px;"></div>
-                    <span>Perubahan Sedang (20-50%)</span>
-                </div>
-                <div style="display: flex; align-items: center; margin-bottom: 5px;">
-                    <div style="width: 15px; height: 15px; border-radius: 50%; background-color: green; margin-right: 5px;"></div>
-                    <span>Perubahan Rendah (<20%)</span>
-                </div>
-                <div style="display: flex; align-items: center;">
-                    <div style="width: 15px; height: 15px; border-radius: 50%; background-color: blue; margin-right: 5px;"></div>
-                    <span>Tahun Dasar (2020)</span>
+                # Add legend
+                legend_html = """
+                <div style="position: fixed; bottom: 50px; left: 50px; z-index: 1000; background-color: white; padding: 10px; border-radius: 5px; box-shadow: 0 0 5px rgba(0,0,0,0.3);">
+                    <p><b>Perubahan Lahan:</b></p>
+                    <div style="display: flex; align-items: center; margin-bottom: 5px;">
+                        <div style="width: 15px; height: 15px; border-radius: 50%; background-color: red; margin-right: 5px;"></div>
+                        <span>Perubahan Tinggi (>50%)</span>
+                    </div>
+                    <div style="display: flex; align-items: center; margin-bottom: 5px;">
+                        <div style="width: 15px; height: 15px; border-radius: 50%; background-color: orange; margin-right: 5px;"></div>
+                        <span>Perubahan Sedang (20-50%)</span>
+                    </div>
+                    <div style="display: flex; align-items: center; margin-bottom: 5px;">
+                        <div style="width: 15px; height: 15px; border-radius: 50%; background-color: green; margin-right: 5px;"></div>
+                        <span>Perubahan Rendah (<20%)</span>
+                    </div>
+                    <div style="display: flex; align-items: center;">
+                        <div style="width: 15px; height: 15px; border-radius: 50%; background-color: blue; margin-right: 5px;"></div>
+                        <span>Tahun Dasar (2020)</span>
+                    </div>
+                    <p><i>Ukuran lingkaran menunjukkan luas area</i></p>
                 </div>
-                <p><i>Ukuran lingkaran menunjukkan luas area</i></p>
-            </div>
-            """
-            m.get_root().html.add_child(folium.Element(legend_html))
-            
-            # Display the map
-            folium_static(m, width=800, height=500)
+                """
+                m.get_root().html.add_child(folium.Element(legend_html))
+                return m
+
+            # Rendered once per (year, data version); moving the slider back is a cache hit
+            map_html = cached_map_html(
+                "Analisis Perubahan Lahan", selected_year, f"{data_version()}|{concessions_version()}",
+                build_land_change_map, variant=concessions_url
+            )
+            show_map_html(map_html, width=800, height=500)
 
         with col2:
             # Add side panel with statistics
@@ -672,15 +542,14 @@ def main_app():
 
         # Anomaly detection model
         st.subheader("Model Deteksi Anomali Perubahan Lahan")
-        X = land_change[['percent_change', 'deforestation_impact', 'water_impact']].copy()
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        model = IsolationForest(contamination=0.3, random_state=42)
-        model.fit(X_scaled)
-        anomaly_scores = -model.score_samples(X_scaled)
-        land_change['model_anomaly_score'] = anomaly_scores
-        land_change['model_anomaly'] = model.predict(X_scaled)
-        land_change['model_anomaly'] = land_change['model_anomaly'].map({1: 'Normal', -1: 'Anomali'})
+        # Trained once per data version by the model registry; only inference here
+        model, _ = get_model('land_anomaly', data_version(), land_change)
+        X = land_change[ANOMALY_FEATURES]
+        anomaly_scores = -model.score_samples(X)
+        land_change = land_change.assign(
+            model_anomaly_score=anomaly_scores,
+            model_anomaly=pd.Series(model.predict(X), index=land_change.index).map({1: 'Normal', -1: 'Anomali'})
+        )
         
         col1, col2 = st.columns(2)
         with col1:
@@ -733,63 +602,62 @@ def main_app():
 
     # Deteksi Transaksi Mencurigakan
     elif page == "Deteksi Transaksi Mencurigakan":
+        import plotly.express as px
+        from explorer import TransactionFilter, transaction_index, cube_histogram, histogram_labels, format_page, TABLE_PAGE_SIZE
         st.title("Deteksi Transaksi Keuangan Mencurigakan")
         st.markdown("""
         Halaman ini menampilkan analisis transaksi keuangan pejabat daerah yang berpotensi
         terkait dengan aktivitas pencucian uang di sektor pertambangan.
         """)
 
+        # Aggregates come from the pre-aggregated cube, not from the raw rows
+        cube = live.cube
+        by_flag = cube.cells.groupby('flag')[['amount', 'count']].sum()
         st.subheader("Ringkasan Transaksi")
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            total_transactions = len(transactions)
+            total_transactions = int(by_flag['count'].sum())
             st.metric("Total Transaksi", f"{total_transactions:,}")
         with col2:
-            suspicious_count = len(transactions[transactions['flag'] == 'Suspicious'])
+            suspicious_count = int(by_flag['count'].get('Suspicious', 0))
             st.metric("Transaksi Mencurigakan", f"{suspicious_count:,}", f"{suspicious_count/total_transactions*100:.1f}%")
         with col3:
-            total_amount = transactions['amount'].sum()
+            total_amount = by_flag['amount'].sum()
             st.metric("Total Nilai Transaksi", f"Rp {total_amount:,.0f}")
         with col4:
-            suspicious_amount = transactions[transactions['flag'] == 'Suspicious']['amount'].sum()
+            suspicious_amount = by_flag['amount'].get('Suspicious', 0)
             st.metric("Nilai Transaksi Mencurigakan", f"Rp {suspicious_amount:,.0f}", f"{suspicious_amount/total_amount*100:.1f}%")
 
         st.subheader("Filter Transaksi")
+        index = transaction_index(f"{data_version()}|{live.version}", transactions)
         col1, col2, col3 = st.columns(3)
         with col1:
-            selected_districts = st.multiselect("Kabupaten", options=sorted(transactions['district'].unique()), default=[])
+            selected_districts = st.multiselect("Kabupaten", options=list(index.categories['district']), default=[])
         with col2:
-            selected_positions = st.multiselect("Jabatan", options=sorted(transactions['position'].unique()), default=[])
+            selected_positions = st.multiselect("Jabatan", options=list(index.categories['position']), default=[])
         with col3:
-            selected_types = st.multiselect("Jenis Transaksi", options=sorted(transactions['transaction_type'].unique()), default=[])
-        date_range = st.slider(
-            "Rentang Tanggal",
-            min_value=transactions['date'].min().date(),
-            max_value=transactions['date'].max().date(),
-            value=(transactions['date'].min().date(), transactions['date'].max().date())
-        )
-
-        filtered_transactions = transactions.copy()
-        if selected_districts:
-            filtered_transactions = filtered_transactions[filtered_transactions['district'].isin(selected_districts)]
-        if selected_positions:
-            filtered_transactions = filtered_transactions[filtered_transactions['position'].isin(selected_positions)]
-        if selected_types:
-            filtered_transactions = filtered_transactions[filtered_transactions['transaction_type'].isin(selected_types)]
-        filtered_transactions = filtered_transactions[
-            (filtered_transactions['date'].dt.date >= date_range[0]) &
-            (filtered_transactions['date'].dt.date <= date_range[1])
-        ]
+            selected_types = st.multiselect("Jenis Transaksi", options=list(index.categories['transaction_type']), default=[])
+        min_date, max_date = index.date_range
+        date_range = st.slider("Rentang Tanggal", min_value=min_date, max_value=max_date, value=(min_date, max_date))
+
+        criteria = TransactionFilter({
+            'district': selected_districts,
+            'position': selected_positions,
+            'transaction_type': selected_types
+        }, *date_range)
+        selection = index.filter(criteria, previous=st.session_state.get('transaction_selection'))
+        st.session_state['transaction_selection'] = selection
+        cells = cube.rollup(criteria, lambda edge: transactions.iloc[index.filter(edge).rows])
 
         st.subheader("Analisis Transaksi")
         col1, col2 = st.columns(2)
         with col1:
-            tx_by_type = filtered_transactions.groupby('transaction_type')['amount'].sum().reset_index()
+            tx_by_type = cells.groupby('transaction_type')['amount'].sum().reset_index()
             fig = px.pie(tx_by_type, values='amount', names='transaction_type', title='Distribusi Nilai Transaksi berdasarkan Jenis', hole=0.4)
             fig.update_traces(textinfo='percent+label')
             st.plotly_chart(fig, use_container_width=True)
         with col2:
-            tx_by_flag = filtered_transactions.groupby('flag')['amount'].sum().reset_index()
+            tx_by_flag = cells.groupby('flag')['amount'].sum().reset_index()
             fig = px.pie(
                 tx_by_flag,
                 values='amount',
@@ -803,10 +671,10 @@ def main_app():
             st.plotly_chart(fig, use_container_width=True)
 
         st.subheader("Timeline Transaksi")
-        timeline_data = filtered_transactions.groupby([pd.Grouper(key='date', freq='M'), 'flag'])['amount'].sum().reset_index()
+        timeline_data = cells.groupby(['month', 'flag'])['amount'].sum().reset_index()
         fig = px.line(
             timeline_data,
-            x='date',
+            x='month',
             y='amount',
             color='flag',
             title='Nilai Transaksi per Bulan',
@@ -816,11 +684,12 @@ def main_app():
         st.plotly_chart(fig, use_container_width=True)
 
         st.subheader("Pejabat dengan Transaksi Mencurigakan")
-        suspicious_by_official = filtered_transactions[filtered_transactions['flag'] == 'Suspicious'].groupby('official_name').agg(
+        suspicious_by_official = cells[cells['flag'] == 'Suspicious'].groupby('official_name').agg(
             total_suspicious=('amount', 'sum'),
-            count_suspicious=('amount', 'count'),
-            avg_ml_score=('ml_score', 'mean')
+            count_suspicious=('count', 'sum'),
+            ml_score_sum=('ml_score', 'sum')
         ).reset_index().sort_values('total_suspicious', ascending=False)
+        suspicious_by_official['avg_ml_score'] = suspicious_by_official['ml_score_sum'] / suspicious_by_official['count_suspicious']
         if not suspicious_by_official.empty:
             fig = px.bar(
                 suspicious_by_official.head(10),
@@ -844,43 +713,55 @@ def main_app():
         st.subheader("Pola Transaksi Mencurigakan")
         col1, col2 = st.columns(2)
         with col1:
-            fig = px.histogram(
-                filtered_transactions,
-                x='amount',
+            # Binned by label so the open last bin reads '> 100.000'
+            fig = px.bar(
+                cube_histogram(cells, 'amount'),
+                x='bin',
+                y='count',
                 color='flag',
-                marginal='box',
                 title='Distribusi Nilai Transaksi',
                 color_discrete_map={'Normal': 'green', 'Suspicious': 'red'},
-                nbins=50
+                category_orders={'bin': histogram_labels('amount')}
             )
-            fig.update_layout(xaxis_title="Nilai Transaksi (Rp)", yaxis_title="Jumlah Transaksi")
+            fig.update_layout(xaxis_title="Nilai Transaksi (Rp)", yaxis_title="Jumlah Transaksi", bargap=0)
             st.plotly_chart(fig, use_container_width=True)
         with col2:
-            fig = px.histogram(
-                filtered_transactions,
+            fig = px.bar(
+                cube_histogram(cells, 'ml_score'),
                 x='ml_score',
+                y='count',
                 color='flag',
-                marginal='box',
                 title='Distribusi Skor ML',
-                color_discrete_map={'Normal': 'green', 'Suspicious': 'red'},
-                nbins=50
+                color_discrete_map={'Normal': 'green', 'Suspicious': 'red'}
             )
-            fig.update_layout(xaxis_title="Skor ML", yaxis_title="Jumlah Transaksi")
+            fig.update_layout(xaxis_title="Skor ML", yaxis_title="Jumlah Transaksi", bargap=0)
             st.plotly_chart(fig, use_container_width=True)
 
         st.subheader("Tabel Transaksi Terfilter")
-        display_transactions = filtered_transactions.copy()
-        display_transactions['date'] = display_transactions['date'].dt.strftime('%d %b %Y')
-        display_transactions['amount'] = display_transactions['amount'].apply(lambda x: f"Rp {x:,.0f}")
-        display_transactions['ml_score'] = display_transactions['ml_score'].apply(lambda x: f"{x:.2f}")
-        display_columns = ['date', 'official_name', 'position', 'district', 'amount', 'transaction_type', 'counterparty', 'ml_score', 'flag']
-        st.dataframe(
-            display_transactions[display_columns].style.apply(
-                lambda x: ['background-color: #ffcccc' if x['flag'] == 'Suspicious' else '' for i in x],
-                axis=1
-            ),
-            height=400
+        # Searching, sorting and paging run on the index; only the visible page is formatted
+        sort_labels = {
+            'date': 'Tanggal', 'official_name': 'Nama Pejabat', 'position': 'Jabatan', 'district': 'Kabupaten',
+            'amount': 'Nilai Transaksi', 'transaction_type': 'Jenis Transaksi', 'counterparty': 'Pihak Terkait',
+            'ml_score': 'Skor ML', 'flag': 'Flag'
+        }
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            search_text = st.text_input("Cari Pejabat, Pihak Terkait, Kabupaten, Jabatan atau Jenis Transaksi", value="")
+        with col2:
+            sort_column = st.selectbox("Urutkan Berdasarkan", options=list(sort_labels), format_func=sort_labels.get)
+        with col3:
+            sort_ascending = st.toggle("Urutan Naik", value=True)
+        table_positions = index.sort(index.search(selection.positions, search_text), sort_column, sort_ascending)
+        n_pages = max(1, -(-len(table_positions) // TABLE_PAGE_SIZE))
+        page_number = st.number_input(
+            f"Halaman (dari {n_pages:,})", min_value=1, max_value=n_pages, value=1, key=f"transaction_page_{n_pages}"
+        )
+        page = index.page(table_positions, page_number - 1)
+        st.caption(
+            f"Menampilkan {(page_number - 1) * TABLE_PAGE_SIZE + min(1, len(page)):,}–"
+            f"{(page_number - 1) * TABLE_PAGE_SIZE + len(page):,} dari {len(table_positions):,} transaksi"
         )
+        st.dataframe(format_page(page), height=400, hide_index=True)
 
         st.subheader("Penjelasan Model Machine Learning")
         st.markdown("""
@@ -892,15 +773,25 @@ def main_app():
         
         Model ini juga mempertimbangkan profil risiko pejabat berdasarkan jabatan dan koneksi dengan tambang.
         """)
+        # Permutation importance of the classifier that flags the transactions,
+        # computed when it was trained
+        _, transaction_meta = get_model('transaction_classifier', data_version(), transaction_frame)
+        st.caption(f"Model dilatih {transaction_meta['trained_at']} pada {transaction_meta['n_samples']:,} transaksi (data {transaction_meta['data_version']})")
+        feature_labels = {
+            'frequency_pattern': 'Pola Frekuensi',
+            'structuring_pattern': 'Pola Strukturisasi',
+            'unusual_pattern': 'Pola Tidak Biasa',
+            'official_risk': 'Skor Risiko Pejabat'
+        }
         feature_importance = pd.DataFrame({
-            'Feature': ['Pola Frekuensi', 'Pola Strukturisasi', 'Pola Tidak Biasa', 'Skor Risiko Pejabat'],
-            'Importance': [0.25, 0.30, 0.25, 0.20]
-        })
+            'Feature': [feature_labels[feature] for feature in transaction_meta['importance']],
+            'Importance': list(transaction_meta['importance'].values())
+        }).sort_values('Importance', ascending=False)
         fig = px.bar(
             feature_importance,
             x='Feature',
             y='Importance',
-            title='Kepentingan Fitur dalam Model ML',
+            title='Kepentingan Fitur dalam Model ML (Permutation Importance)',
             color='Importance',
             color_continuous_scale=['blue', 'purple', 'red']
         )
@@ -908,6 +799,13 @@ def main_app():
 
     # Analisis Jaringan Sosial
     elif page == "Analisis Jaringan Sosial":
+        import plotly.express as px
+        import streamlit.components.v1 as components
+        from graph import (
+            EDGE_TYPES, NETWORK_DETAIL_MAX_NODES, NETWORK_HEIGHT, NODE_SEARCH_LIMIT, QUERY_MAX_NODES, community_table, graph_index,
+            network_analysis, network_html, query_view
+        )
+
         st.title("Analisis Jaringan Sosial")
         st.markdown("""
         Halaman ini menampilkan analisis jaringan sosial antara pejabat daerah dan perusahaan tambang
@@ -916,51 +814,37 @@ def main_app():
 
         st.subheader("Visualisasi Jaringan")
         
-        # Create a networkx graph first
-        G = nx.Graph()
-        for _, official in officials.iterrows():
-            G.add_node(official['name'], type='Official', position=official['position'], district=official['district'], risk_score=official['risk_score'])
-        for _, mine in mining_data.iterrows():
-            G.add_node(mine['company'], type='Company', commodity=mine['commodity'], district=mine['district'], license_type=mine['license_type'])
-        for _, conn in connections.iterrows():
-            G.add_edge(conn['source'], conn['target'], weight=conn['weight'], type=conn['type'], description=conn['description'])
+        # Graph built once per data version; communities, layout and centralities are computed in the background
+        analysis = network_analysis(data_version(), officials, mining_data, connections)
+        G = analysis.graph
+        with st.spinner("Menyusun tata letak jaringan..."):
+            layout = analysis.layout()
         
         try:
-            # Try to use pyvis Network
-            from pyvis.network import Network
-            net = Network(height="600px", width="100%", bgcolor="#ffffff", font_color="black")
-            net.barnes_hut(gravity=-80000, central_gravity=0.3, spring_length=250, spring_strength=0.001, damping=0.09)
-            
-            # Add nodes and edges
-            for node in G.nodes(data=True):
-                node_name, node_attrs = node
-                if node_attrs['type'] == 'Official':
-                    color = '#e74c3c' if node_attrs['risk_score'] > 0.6 else '#f39c12' if node_attrs['risk_score'] > 0.3 else '#3498db'
-                    title = f"Pejabat: {node_name}<br>Jabatan: {node_attrs['position']}<br>Kabupaten: {node_attrs['district']}<br>Skor Risiko: {node_attrs['risk_score']:.2f}"
-                    net.add_node(node_name, title=title, color=color, size=20, shape='circle')
-                else:
-                    title = f"Perusahaan: {node_name}<br>Komoditas: {node_attrs['commodity']}<br>Kabupaten: {node_attrs['district']}<br>Jenis Izin: {node_attrs['license_type']}"
-                    net.add_node(node_name, title=title, color='#2ecc71', size=25, shape='square')
-            
-            for edge in G.edges(data=True):
-                source, target, edge_attrs = edge
-                width = edge_attrs['weight'] * 5
-                color = '#e74c3c' if edge_attrs['type'] == 'Official-Company' else '#95a5a6'
-                net.add_edge(source, target, title=edge_attrs['description'], width=width, color=color)
-            
-            # Save and display
-            net.save_graph("network.html")
-            with open("network.html", "r", encoding="utf-8") as f:
-                components.html(f.read(), height=600)
-                
-        except (ImportError, NameError) as e:
-            # Fallback to a simple networkx visualization if pyvis is not available
+            # Large graphs are shown as one node per community until the user expands some
+            expanded = None
+            if G.number_of_nodes() > NETWORK_DETAIL_MAX_NODES:
+                st.info(f"Jaringan berisi {G.number_of_nodes():,} node dan ditampilkan per komunitas. Pilih komunitas untuk melihat anggotanya.")
+                expanded = tuple(sorted(st.multiselect(
+                    "Perluas Komunitas",
+                    range(len(layout.sizes)),
+                    format_func=lambda community: f"Komunitas {community + 1} ({layout.sizes[community]:,} node)"
+                )))
+            else:
+                st.caption("Perkecil tampilan untuk meringkas komunitas; klik ganda untuk membukanya kembali.")
+            # Rendered in memory once per data version; the extra height is the search box
+            components.html(network_html(data_version(), analysis, expanded), height=NETWORK_HEIGHT + 60)
+
+        except (ImportError, OSError) as e:
+            # Fallback to a simple networkx visualization if the interactive view cannot be built
             st.error(f"Tidak dapat memuat visualisasi jaringan interaktif. Error: {str(e)}")
             st.info("Menampilkan visualisasi jaringan sederhana sebagai alternatif.")
+            import matplotlib.pyplot as plt
+            import networkx as nx
             
             # Create a simple matplotlib visualization
             plt.figure(figsize=(10, 8))
-            pos = nx.spring_layout(G, seed=42)
+            pos = {node: (x, -y) for node, (x, y) in zip(analysis.nodes, layout.positions)}
             
             # Draw nodes
             official_nodes = [n for n, attr in G.nodes(data=True) if attr.get('type') == 'Official']
@@ -980,33 +864,59 @@ def main_app():
             plt.axis('off')
             st.pyplot(plt)
 
+        st.subheader("Penelusuran Jaringan")
+        st.markdown("Tampilkan lingkungan seorang pejabat atau jalur terpendek antara dua node, hanya melalui koneksi yang dipilih.")
+        index = graph_index(data_version(), analysis.nodes, connections)
+        col1, col2 = st.columns(2)
+        with col1:
+            query_kind = st.radio("Jenis Penelusuran", ["Lingkungan (k-hop)", "Jalur Terpendek"], horizontal=True)
+            # Only the matches of a search are sent to the browser, never every node
+            search_help = f"Menampilkan hingga {NODE_SEARCH_LIMIT} node yang cocok."
+            source_candidates = index.search(st.text_input("Cari Node Awal", placeholder="Nama pejabat atau perusahaan", help=search_help))
+            query_node = st.selectbox("Node Awal", source_candidates)
+            if query_kind == "Lingkungan (k-hop)":
+                query_argument = st.slider("Jumlah Langkah (hop)", 1, 3, 2)
+            else:
+                target_candidates = index.search(st.text_input("Cari Node Tujuan", placeholder="Nama pejabat atau perusahaan", help=search_help))
+                query_argument = st.selectbox("Node Tujuan", target_candidates, index=len(target_candidates) - 1 if target_candidates else 0)
+        with col2:
+            query_types = st.multiselect("Jenis Koneksi", EDGE_TYPES, default=EDGE_TYPES)
+            query_weight = st.slider("Bobot Minimum", 0.0, 1.0, 0.0, 0.05)
+
+        if query_node is None or query_argument is None:
+            st.info("Tidak ada node yang cocok dengan pencarian.")
+        else:
+            result, query_html = query_view(
+                data_version(), analysis, index, 'k_hop' if query_kind == "Lingkungan (k-hop)" else 'path',
+                query_node, query_argument, tuple(query_types), query_weight
+            )
+            if result is None:
+                st.warning(f"Tidak ada jalur antara {query_node} dan {query_argument} melalui koneksi yang dipilih.")
+            else:
+                if result.path is not None:
+                    st.info(f"Jalur ({len(result) - 1} langkah): " + " → ".join(result.names))
+                else:
+                    st.caption(f"{len(result):,} node dan {len(result.edges):,} koneksi dalam {query_argument} langkah dari {query_node}.")
+                    if result.truncated:
+                        st.warning(f"Hasil dibatasi {QUERY_MAX_NODES:,} node; naikkan bobot minimum atau kurangi jumlah langkah.")
+                components.html(query_html, height=NETWORK_HEIGHT + 60)
+
+        with st.spinner("Menghitung sentralitas jaringan..."):
+            centrality, network_metrics = analysis.result()
+
         st.subheader("Metrik Jaringan")
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Jumlah Node", len(G.nodes()))
+            st.metric("Jumlah Node", network_metrics['nodes'])
         with col2:
-            st.metric("Jumlah Edge", len(G.edges()))
+            st.metric("Jumlah Edge", network_metrics['edges'])
         with col3:
-            density = nx.density(G)
-            st.metric("Densitas Jaringan", f"{density:.3f}")
+            st.metric("Densitas Jaringan", f"{network_metrics['density']:.3f}")
         with col4:
-            avg_clustering = nx.average_clustering(G)
-            st.metric("Koefisien Clustering", f"{avg_clustering:.3f}")
+            st.metric("Koefisien Clustering", f"{network_metrics['average_clustering']:.3f}")
 
         st.subheader("Analisis Sentralitas")
-        degree_centrality = nx.degree_centrality(G)
-        betweenness_centrality = nx.betweenness_centrality(G)
-        eigenvector_centrality = nx.eigenvector_centrality(G, max_iter=1000)
-        centrality_df = pd.DataFrame({
-            'Node': list(degree_centrality.keys()),
-            'Degree Centrality': list(degree_centrality.values()),
-            'Betweenness Centrality': list(betweenness_centrality.values()),
-            'Eigenvector Centrality': list(eigenvector_centrality.values())
-        })
-        centrality_df['Type'] = centrality_df['Node'].apply(lambda x: 'Official' if x in officials['name'].values else 'Company')
-        risk_scores = {official['name']: official['risk_score'] for _, official in officials.iterrows()}
-        centrality_df['Risk Score'] = centrality_df['Node'].apply(lambda x: risk_scores.get(x, 0) if x in officials['name'].values else 0)
-        centrality_df = centrality_df.sort_values('Degree Centrality', ascending=False)
+        centrality_df = centrality.sort_values('Degree Centrality', ascending=False)
 
         col1, col2 = st.columns(2)
         with col1:
@@ -1052,13 +962,7 @@ def main_app():
         st.plotly_chart(fig, use_container_width=True)
 
         st.subheader("Deteksi Komunitas")
-        communities = nx.community.louvain_communities(G)
-        community_data = []
-        for i, community in enumerate(communities):
-            for node in community:
-                node_type = 'Official' if node in officials['name'].values else 'Company'
-                community_data.append({'Node': node, 'Community': f"Komunitas {i+1}", 'Type': node_type})
-        community_df = pd.DataFrame(community_data)
+        community_df = community_table(analysis.communities(), analysis.node_table)
         community_size = community_df.groupby('Community').size().reset_index(name='Size')
         fig = px.bar(community_size, x='Community', y='Size', title='Ukuran Komunitas', color='Community')
         st.plotly_chart(fig, use_container_width=True)
@@ -1076,9 +980,7 @@ def main_app():
         st.plotly_chart(fig, use_container_width=True)
 
         st.subheader("Analisis Risiko berdasarkan Komunitas")
-        community_risk = community_df.copy()
-        community_risk['Risk Score'] = community_risk['Node'].apply(lambda x: risk_scores.get(x, 0) if x in officials['name'].values else 0)
-        community_avg_risk = community_risk[community_risk['Type'] == 'Official'].groupby('Community')['Risk Score'].mean().reset_index()
+        community_avg_risk = community_df[community_df['Type'] == 'Official'].groupby('Community')['Risk Score'].mean().reset_index()
         fig = px.bar(
             community_avg_risk,
             x='Community',
@@ -1091,6 +993,13 @@ def main_app():
 
     # Integrasi & Prediksi
     elif page == "Integrasi & Prediksi":
+        import plotly.express as px
+        from data import weighted_risk_score, RISK_LABELS
+        from models import (
+            get_model, score_intervention_bundles, portfolio_scores, optimize_interventions,
+            INTERVENTION_EFFECTS, INTERVENTION_COSTS
+        )
+
         st.title("Integrasi & Prediksi")
         st.markdown("""
         Halaman ini menampilkan analisis integrasi risiko dan model prediktif untuk
@@ -1120,10 +1029,8 @@ def main_app():
             st.info(f"Tidak ada pejabat yang terkait dengan {selected_mine}")
 
         st.subheader("Model Prediktif Risiko Pencucian Uang")
-        X = integrated_risk[['land_change_risk', 'financial_risk', 'official_risk', 'transaction_risk']].values
-        y = integrated_risk['risk_category'].map({'Rendah': 0, 'Sedang': 1, 'Tinggi': 2}).values
-        model = RandomForestClassifier(n_estimators=100, random_state=42)
-        model.fit(X, y)
+        model, model_meta = get_model('risk_classifier', data_version(), integrated_risk)
+        st.caption(f"Model dilatih {model_meta['trained_at']} pada {model_meta['n_samples']} lokasi tambang (data {model_meta['data_version']})")
         feature_importance = pd.DataFrame({
             'Feature': ['Perubahan Lahan', 'Keuangan', 'Pejabat', 'Transaksi'],
             'Importance': model.feature_importances_
@@ -1148,11 +1055,20 @@ def main_app():
             new_official = st.slider("Risiko Pejabat", 0.0, 1.0, float(mine_data['official_risk']), step=0.01)
             new_transaction = st.slider("Risiko Transaksi", 0.0, 1.0, float(mine_data['transaction_risk']), step=0.01)
 
-        new_integrated_score = (new_land * 0.25 + new_financial * 0.25 + new_official * 0.25 + new_transaction * 0.25)
-        new_features = np.array([[new_land, new_financial, new_official, new_transaction]])
-        predicted_category_idx = model.predict(new_features)[0]
-        predicted_category = ['Rendah', 'Sedang', 'Tinggi'][predicted_category_idx]
-        probabilities = model.predict_proba(new_features)[0]
+        new_integrated_score = weighted_risk_score({
+            'land_change_risk': new_land,
+            'financial_risk': new_financial,
+            'official_risk': new_official,
+            'transaction_risk': new_transaction
+        })
+        # Every combination of interventions scored in one batch; the empty one
+        # is the slider point itself, so the prediction and "Sebelum Intervensi"
+        # below are the same exact model score
+        new_factors = [new_land, new_financial, new_official, new_transaction]
+        bundles = score_intervention_bundles(model, new_factors)
+        baseline_bundle = bundles[bundles['n_interventions'] == 0].iloc[0]
+        probabilities = baseline_bundle[[f'p_{label.lower()}' for label in RISK_LABELS]].to_numpy(dtype=float)
+        predicted_category = baseline_bundle['predicted_category']
 
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -1202,48 +1118,55 @@ def main_app():
             """)
 
         st.subheader("Simulasi Intervensi")
-        intervention_options = [
-            "Audit Keuangan Menyeluruh",
-            "Verifikasi Izin Tambang",
-            "Investigasi Pejabat Terkait",
-            "Pemantauan Transaksi",
-            "Evaluasi Dampak Lingkungan"
-        ]
-        selected_interventions = st.multiselect("Pilih Intervensi yang Akan Diterapkan", options=intervention_options)
+        selected_interventions = st.multiselect("Pilih Intervensi yang Akan Diterapkan", options=list(INTERVENTION_EFFECTS))
         if selected_interventions:
-            intervention_effects = {
-                "Audit Keuangan Menyeluruh": {'financial': -0.3, 'transaction': -0.2},
-                "Verifikasi Izin Tambang": {'land': -0.25, 'official': -0.1},
-                "Investigasi Pejabat Terkait": {'official': -0.4, 'transaction': -0.2},
-                "Pemantauan Transaksi": {'transaction': -0.35},
-                "Evaluasi Dampak Lingkungan": {'land': -0.3}
-            }
-            sim_land, sim_financial, sim_official, sim_transaction = new_land, new_financial, new_official, new_transaction
-            for intervention in selected_interventions:
-                effects = intervention_effects[intervention]
-                if 'land' in effects:
-                    sim_land = max(0, sim_land + effects['land'])
-                if 'financial' in effects:
-                    sim_financial = max(0, sim_financial + effects['financial'])
-                if 'official' in effects:
-                    sim_official = max(0, sim_official + effects['official'])
-                if 'transaction' in effects:
-                    sim_transaction = max(0, sim_transaction + effects['transaction'])
-            
-            post_intervention_score = (sim_land * 0.25 + sim_financial * 0.25 + sim_official * 0.25 + sim_transaction * 0.25)
-            post_features = np.array([[sim_land, sim_financial, sim_official, sim_transaction]])
-            post_category_idx = model.predict(post_features)[0]
-            post_category = ['Rendah', 'Sedang', 'Tinggi'][post_category_idx]
+            # Before and after are both exact model scores of a bundle (the empty
+            # one before), so only the interventions can change the category
+            selected_bundle = bundles[bundles['interventions'].map(set) == set(selected_interventions)].iloc[0]
+            post_intervention_score = selected_bundle['integrated_risk_score']
+            post_category = selected_bundle['predicted_category']
             
             st.subheader("Hasil Simulasi Intervensi")
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("Skor Risiko Sebelum Intervensi", f"{new_integrated_score:.2f}")
-                st.metric("Kategori Risiko Sebelum Intervensi", predicted_category)
+                st.metric("Skor Risiko Sebelum Intervensi", f"{baseline_bundle['integrated_risk_score']:.2f}")
+                st.metric("Kategori Risiko Sebelum Intervensi", baseline_bundle['predicted_category'])
             with col2:
                 st.metric("Skor Risiko Setelah Intervensi", f"{post_intervention_score:.2f}")
                 st.metric("Kategori Risiko Setelah Intervensi", post_category)
 
+        st.subheader("Peringkat Kombinasi Intervensi")
+        top_bundles = bundles[bundles['n_interventions'] > 0].head(5)
+        st.dataframe(pd.DataFrame({
+            'Intervensi': top_bundles['interventions'].map(', '.join),
+            'Skor Risiko': top_bundles['integrated_risk_score'].round(2),
+            'Kategori Prediksi': top_bundles['predicted_category'],
+            'Probabilitas Tinggi': top_bundles['p_tinggi'].round(2)
+        }), hide_index=True)
+
+        st.subheader("Optimasi Anggaran Intervensi")
+        st.markdown("Alokasi intervensi ke seluruh lokasi tambang yang paling menurunkan jumlah ekspektasi lokasi berisiko tinggi dalam batas anggaran.")
+        st.caption("Biaya per lokasi (juta Rp): " + ", ".join(f"{name} {cost}" for name, cost in INTERVENTION_COSTS.items()))
+        budget = st.number_input("Anggaran Intervensi (juta Rp)", min_value=0, value=2000, step=100)
+        plan = optimize_interventions(
+            model, integrated_risk, budget, scores=portfolio_scores(model, model_meta, integrated_risk)
+        )
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Anggaran Terpakai", f"Rp {plan['cost'].sum():,.0f} juta")
+        with col2:
+            st.metric("Ekspektasi Lokasi Risiko Tinggi", f"{plan['p_tinggi_after'].sum():.2f}", f"{-plan['reduction'].sum():.2f}")
+        with col3:
+            st.metric("Lokasi Diintervensi", int((plan['cost'] > 0).sum()))
+        allocated = plan[plan['cost'] > 0].sort_values('reduction', ascending=False)
+        st.dataframe(pd.DataFrame({
+            'Lokasi Tambang': allocated['mine_name'],
+            'Intervensi': allocated['interventions'].map(', '.join),
+            'Biaya (juta Rp)': allocated['cost'],
+            'Probabilitas Tinggi Sebelum': allocated['p_tinggi_before'].round(2),
+            'Probabilitas Tinggi Sesudah': allocated['p_tinggi_after'].round(2)
+        }), hide_index=True)
+
 # Run the app
 if st.session_state['username'] is None:
     login_page()
@@ -0,0 +1,366 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from features import compute_pattern_features
+
+# Data source/version used by the dashboard. Bump DATA_VERSION whenever the
+# generator or the underlying data changes so every session picks it up.
+DATA_SOURCE = 'sample'
+DATA_VERSION = '5'
+DATA_SEED = 42
+DATA_CACHE_TTL = 3600
+
+# Synthetic transaction distributions
+TRANSACTION_TYPES = np.array(
+    ['Bank Transfer', 'E-Wallet', 'Cash Deposit', 'Property Purchase', 'Investment', 'Offshore Transfer'],
+    dtype=object
+)
+TRANSACTION_TYPE_P = [0.3, 0.2, 0.2, 0.1, 0.1, 0.1]
+STRUCTURING_AMOUNTS = np.array([99000, 99900, 99990])
+# Share of normal and of suspicious transactions just under the reporting threshold
+STRUCTURING_P = (0.2, 0.5)
+OFFSHORE_COUNTERPARTIES = np.array(['Singapore Account', 'Hong Kong Account', 'Cayman Islands LLC'], dtype=object)
+INVESTMENT_COUNTERPARTIES = np.array(['Mining Company', 'Shell Corporation', 'Family Business'], dtype=object)
+DEFAULT_COUNTERPARTIES = np.array(['Personal Account', 'Family Member', 'Local Business', 'Government Account'], dtype=object)
+
+# Columns of a transaction row, in the order the pages and the store use
+TRANSACTION_COLUMNS = [
+    'date', 'official_id', 'official_name', 'position', 'district', 'amount', 'transaction_type', 'counterparty',
+    'frequency_pattern', 'structuring_pattern', 'unusual_pattern', 'ml_score', 'flag', 'connected_mine_id'
+]
+# Transactions scoring above this are flagged as suspicious
+ML_SCORE_THRESHOLD = 0.6
+
+# ml_score: mean of the three pattern features blended with the official's risk
+def transaction_ml_score(frequency_pattern, structuring_pattern, unusual_pattern, risk_score):
+    return (frequency_pattern + structuring_pattern + unusual_pattern) / 3 * 0.7 + risk_score * 0.3
+
+def transaction_flag(ml_score, is_suspicious=False):
+    return np.where((ml_score > ML_SCORE_THRESHOLD) | is_suspicious, 'Suspicious', 'Normal').astype(object)
+
+# Batched transaction generator. Yields DataFrame chunks of at most chunk_size
+# rows; every chunk draws from its own child of SeedSequence(seed), so the same
+# (seed, n_rows, chunk_size) always produces the same rows. is_suspicious is
+# the generated ground truth. The pattern features are drawn per row, which is
+# cheap for bulk benchmark data; load_sample_data computes the real ones.
+def generate_transactions(officials, n_rows, seed=None, chunk_size=100_000,
+                          start_date='2022-01-01', n_days=730):
+    official_ids = officials['id'].to_numpy()
+    official_names = officials['name'].to_numpy(dtype=object)
+    positions = officials['position'].to_numpy(dtype=object)
+    districts = officials['district'].to_numpy(dtype=object)
+    risk_scores = officials['risk_score'].to_numpy(dtype=float)
+    mine_ids = officials['connected_mine_id'].to_numpy()
+    start = np.datetime64(start_date, 'ns')
+
+    n_chunks = -(-n_rows // chunk_size)
+    for chunk, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+        rng = np.random.default_rng(child)
+        n = min(chunk_size, n_rows - chunk * chunk_size)
+
+        idx = rng.integers(0, len(official_ids), n)
+        dates = start + rng.integers(0, n_days, n).astype('timedelta64[D]')
+        risk_score = risk_scores[idx]
+        is_suspicious = rng.random(n) < risk_score
+
+        amount = np.where(
+            rng.random(n) < np.where(is_suspicious, STRUCTURING_P[1], STRUCTURING_P[0]),
+            STRUCTURING_AMOUNTS[rng.integers(0, len(STRUCTURING_AMOUNTS), n)],
+            rng.integers(5000, 100000, n)
+        )
+        transaction_type = TRANSACTION_TYPES[rng.choice(len(TRANSACTION_TYPES), n, p=TRANSACTION_TYPE_P)]
+
+        counterparty = DEFAULT_COUNTERPARTIES[rng.integers(0, len(DEFAULT_COUNTERPARTIES), n)]
+        offshore = is_suspicious & (transaction_type == 'Offshore Transfer')
+        counterparty[offshore] = OFFSHORE_COUNTERPARTIES[rng.integers(0, len(OFFSHORE_COUNTERPARTIES), offshore.sum())]
+        counterparty[is_suspicious & (transaction_type == 'Property Purchase')] = 'Property Agent'
+        investment = is_suspicious & (transaction_type == 'Investment')
+        counterparty[investment] = INVESTMENT_COUNTERPARTIES[rng.integers(0, len(INVESTMENT_COUNTERPARTIES), investment.sum())]
+
+        frequency_pattern = rng.random(n)
+        structuring_pattern = rng.random(n) * np.where(is_suspicious, 1.0, 0.3)
+        unusual_pattern = rng.random(n) * np.where(is_suspicious, 1.0, 0.2)
+
+        ml_score = transaction_ml_score(frequency_pattern, structuring_pattern, unusual_pattern, risk_score)
+        flag = transaction_flag(ml_score, is_suspicious)
+
+        yield pd.DataFrame({
+            'date': dates,
+            'official_id': official_ids[idx],
+            'official_name': official_names[idx],
+            'position': positions[idx],
+            'district': districts[idx],
+            'amount': amount,
+            'transaction_type': transaction_type,
+            'counterparty': counterparty,
+            'frequency_pattern': frequency_pattern,
+            'structuring_pattern': structuring_pattern,
+            'unusual_pattern': unusual_pattern,
+            'ml_score': ml_score,
+            'flag': flag,
+            'connected_mine_id': mine_ids[idx],
+            'is_suspicious': is_suspicious
+        })
+
+# Draws each index of range(n_pairs) independently with probability p, by
+# jumping over geometric gaps instead of flipping a coin per pair.
+def _sample_pairs(rng, n_pairs, p):
+    if n_pairs <= 0 or p <= 0:
+        return np.empty(0, dtype=np.int64)
+    if p >= 1:
+        return np.arange(n_pairs, dtype=np.int64)
+    picks = []
+    position = -1
+    while position < n_pairs - 1:
+        gaps = rng.geometric(p, int((n_pairs - position) * p * 1.1) + 16)
+        indices = position + np.cumsum(gaps)
+        picks.append(indices[indices < n_pairs])
+        position = indices[-1]
+    return np.concatenate(picks)
+
+# Maps a linear index over the upper triangle (i < j) of a size x size matrix,
+# in row-major order, back to (i, j). size may be an array (one per index).
+def _pair_from_index(k, size):
+    k = np.asarray(k, dtype=np.int64)
+    b = 2 * np.asarray(size, dtype=np.int64) - 1
+    i = np.floor((b - np.sqrt(b * b - 8.0 * k)) / 2).astype(np.int64)
+    # Undo float rounding at row boundaries
+    i -= (i * (b - i) // 2) > k
+    i += ((i + 1) * (b - i - 1) // 2) <= k
+    j = k - i * (b - i) // 2 + i + 1
+    return i, j
+
+# Samples pairs of rows sharing the same group code, each with probability p.
+# Returned row indices satisfy source < target.
+def _sample_group_pairs(rng, codes, p):
+    order = np.argsort(codes, kind='stable')
+    sizes = np.bincount(codes).astype(np.int64)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    pair_offsets = np.concatenate([[0], np.cumsum(sizes * (sizes - 1) // 2)])
+    k = _sample_pairs(rng, pair_offsets[-1], p)
+    group = np.searchsorted(pair_offsets, k, side='right') - 1
+    i, j = _pair_from_index(k - pair_offsets[group], sizes[group])
+    return order[starts[group] + i], order[starts[group] + j]
+
+# Official-official and official-company edges as columnar arrays. Pairs are
+# drawn per block (same district, same connected mine, everything else) with
+# the same probabilities and weight ranges the pairwise loop used, so only the
+# sampled edges are ever materialized.
+def generate_connections(officials, mining_locations, seed=None,
+                         p_same_district=0.7, p_same_mine=0.8, p_cross=0.2):
+    rng = np.random.default_rng(seed)
+    names = officials['name'].to_numpy(dtype=object)
+    district_codes = pd.factorize(officials['district'])[0]
+    mine_codes = pd.factorize(officials['connected_mine_id'])[0]
+
+    district_source, district_target = _sample_group_pairs(rng, district_codes, p_same_district)
+
+    mine_source, mine_target = _sample_group_pairs(rng, mine_codes, p_same_mine)
+    keep = district_codes[mine_source] != district_codes[mine_target]
+    mine_source, mine_target = mine_source[keep], mine_target[keep]
+
+    n = len(officials)
+    cross_source, cross_target = _pair_from_index(_sample_pairs(rng, n * (n - 1) // 2, p_cross), n)
+    keep = ((district_codes[cross_source] != district_codes[cross_target]) &
+            (mine_codes[cross_source] != mine_codes[cross_target]))
+    cross_source, cross_target = cross_source[keep], cross_target[keep]
+
+    company_by_mine = mining_locations.set_index('id')['company']
+    connected = (officials['connection_type'] != 'Tidak Ada').to_numpy()
+    company_source = np.flatnonzero(connected)
+
+    blocks = [
+        (district_source, district_target, (0.5, 1.0), 'Official-Official', 'Kolega di pemerintahan daerah'),
+        (mine_source, mine_target, (0.6, 1.0), 'Official-Mine', 'Terlibat di tambang yang sama'),
+        (cross_source, cross_target, (0.1, 0.5), 'Official-Official', 'Koneksi umum'),
+    ]
+    sources, targets, weights, types, descriptions = [], [], [], [], []
+    for source, target, (low, high), edge_type, description in blocks:
+        sources.append(names[source])
+        targets.append(names[target])
+        weights.append(rng.uniform(low, high, len(source)))
+        types.append(np.full(len(source), edge_type, dtype=object))
+        descriptions.append(np.full(len(source), description, dtype=object))
+
+    sources.append(names[company_source])
+    targets.append(officials['connected_mine_id'].map(company_by_mine).to_numpy(dtype=object)[company_source])
+    weights.append(officials['risk_score'].to_numpy(dtype=float)[company_source])
+    types.append(np.full(len(company_source), 'Official-Company', dtype=object))
+    descriptions.append(('Koneksi ' + officials['connection_type'].str.lower()).to_numpy(dtype=object)[company_source])
+
+    return {
+        'source': np.concatenate(sources),
+        'target': np.concatenate(targets),
+        'weight': np.concatenate(weights),
+        'type': np.concatenate(types),
+        'description': np.concatenate(descriptions)
+    }
+
+# Integrated risk configuration
+RISK_FACTORS = ['land_change_risk', 'financial_risk', 'official_risk', 'transaction_risk']
+RISK_WEIGHTS = {
+    'land_change_risk': 0.25,
+    'financial_risk': 0.25,
+    'official_risk': 0.25,
+    'transaction_risk': 0.25
+}
+RISK_BINS = [0, 0.3, 0.6, 1.0]
+RISK_LABELS = ['Rendah', 'Sedang', 'Tinggi']
+
+# Weighted sum of the risk factors; works on a DataFrame/dict of columns or on
+# a dict of scalars (the what-if sliders).
+def weighted_risk_score(factors, weights=RISK_WEIGHTS):
+    return sum(factors[factor] * weight for factor, weight in weights.items())
+
+# Per-mine risk factors with one grouped pass over each source
+def _risk_factors(mining_locations, financial_data, officials, transactions):
+    mine_ids = mining_locations['id']
+    return pd.DataFrame({
+        'land_change_risk': mining_locations.groupby('id')['land_change_anomaly'].mean().reindex(mine_ids).to_numpy(),
+        'financial_risk': financial_data.groupby('mine_id')['suspicious_score'].mean().reindex(mine_ids).to_numpy(),
+        'official_risk': officials.groupby('connected_mine_id')['risk_score'].mean().reindex(mine_ids).to_numpy(),
+        'transaction_risk': transactions.groupby('connected_mine_id')['ml_score'].mean().reindex(mine_ids).to_numpy()
+    }, index=mining_locations.index)
+
+def compute_integrated_risk(mining_locations, financial_data, officials, transactions,
+                            weights=RISK_WEIGHTS, bins=RISK_BINS, labels=RISK_LABELS):
+    integrated_risk = pd.concat([
+        pd.DataFrame({
+            'mine_id': mining_locations['id'],
+            'mine_name': mining_locations['name'],
+            'district': mining_locations['district']
+        }),
+        _risk_factors(mining_locations, financial_data, officials, transactions)
+    ], axis=1).reset_index(drop=True)
+    integrated_risk['integrated_risk_score'] = weighted_risk_score(integrated_risk, weights)
+    integrated_risk['risk_category'] = pd.cut(integrated_risk['integrated_risk_score'], bins=bins, labels=labels)
+    return integrated_risk
+
+# Recomputes only the rows of mine_ids (new mines, or mines whose officials,
+# transactions, financials or land data changed) and keeps the rest as is.
+# Rows come back in mining_locations order; mines no longer listed are dropped.
+def update_integrated_risk(integrated_risk, mine_ids, mining_locations, financial_data, officials, transactions,
+                           weights=RISK_WEIGHTS, bins=RISK_BINS, labels=RISK_LABELS):
+    mine_ids = pd.unique(np.asarray(mine_ids))
+    changed = compute_integrated_risk(
+        mining_locations[mining_locations['id'].isin(mine_ids)],
+        financial_data[financial_data['mine_id'].isin(mine_ids)],
+        officials[officials['connected_mine_id'].isin(mine_ids)],
+        transactions[transactions['connected_mine_id'].isin(mine_ids)],
+        weights, bins, labels
+    )
+    result = pd.concat([integrated_risk[~integrated_risk['mine_id'].isin(mine_ids)], changed], ignore_index=True)
+    position = pd.Index(mining_locations['id']).get_indexer(result['mine_id'])
+    result = result[position >= 0].iloc[np.argsort(position[position >= 0], kind='stable')]
+    return result.reset_index(drop=True)
+
+# Sample data generation function
+def load_sample_data(seed=None):
+    rng = np.random.default_rng(seed)
+
+    # Sample mining locations
+    mining_locations = pd.DataFrame({
+        'id': range(1, 11),
+        'name': [f'Tambang {i}' for i in range(1, 11)],
+        'district': ['Kabupaten A', 'Kabupaten B', 'Kabupaten C', 'Kabupaten D', 'Kabupaten E'] * 2,
+        'province': ['Provinsi X'] * 5 + ['Provinsi Y'] * 5,
+        'company': [f'PT Mining {chr(65+i)}' for i in range(10)],
+        'license_type': ['IUP', 'IUPK', 'IUP', 'IUPK', 'IUP'] * 2,
+        'commodity': ['Batubara', 'Emas', 'Tembaga', 'Nikel', 'Besi'] * 2,
+        'area_2020': [1000, 1500, 1200, 2000, 1800, 1100, 1600, 1300, 1900, 1700],
+        'area_2023': [1200, 1800, 1400, 2500, 2200, 1300, 1900, 1500, 2300, 2000],
+        'land_change_anomaly': [0.2, 0.5, 0.3, 0.7, 0.6, 0.25, 0.45, 0.35, 0.65, 0.55],
+        'lat': [-2.0, -2.5, -3.0, -3.5, -4.0, -2.2, -2.7, -3.2, -3.7, -4.2],
+        'lon': [120.0, 120.5, 121.0, 121.5, 122.0, 120.2, 120.7, 121.2, 121.7, 122.2]
+    })
+
+    # Sample financial data
+    financial_data = pd.DataFrame({
+        'mine_id': range(1, 11),
+        'reported_revenue': [1e9, 2e9, 1.5e9, 3e9, 2.5e9, 1.2e9, 2.2e9, 1.7e9, 2.8e9, 2.3e9],
+        'estimated_production': [10000, 15000, 12000, 20000, 18000, 11000, 16000, 13000, 19000, 17000],
+        'estimated_revenue': [1.2e9, 2.5e9, 1.8e9, 3.5e9, 3e9, 1.4e9, 2.7e9, 2e9, 3.3e9, 2.8e9],
+        'tax_paid': [1e8, 2e8, 1.5e8, 3e8, 2.5e8, 1.2e8, 2.2e8, 1.7e8, 2.8e8, 2.3e8],
+        'suspicious_score': [0.2, 0.5, 0.3, 0.7, 0.6, 0.25, 0.45, 0.35, 0.65, 0.55]
+    })
+
+    # Sample officials
+    officials = pd.DataFrame({
+        'id': range(1, 21),
+        'name': [f'Pejabat {i}' for i in range(1, 21)],
+        'position': ['Kepala Dinas', 'Bupati', 'Sekretaris', 'Anggota DPRD', 'Kepala Bidang'] * 4,
+        'district': ['Kabupaten A', 'Kabupaten B', 'Kabupaten C', 'Kabupaten D', 'Kabupaten E'] * 4,
+        'connected_mine_id': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10] * 2,
+        'connection_type': ['Pemilik', 'Investor', 'Konsultan', 'Tidak Ada', 'Pemegang Saham'] * 4,
+        'risk_score': [0.3, 0.6, 0.4, 0.7, 0.5, 0.35, 0.65, 0.45, 0.75, 0.55] * 2
+    })
+
+    # Sample transactions. Their pattern features are computed from each
+    # official's dated amounts, as for ingested ones, and score and flag follow
+    transactions_df = pd.concat(
+        generate_transactions(officials, 100, seed=int(rng.integers(2**32))),
+        ignore_index=True
+    )
+    frequency, structuring, unusual = compute_pattern_features(transactions_df)
+    risk_score = officials.set_index('id')['risk_score'].reindex(transactions_df['official_id']).to_numpy()
+    ml_score = transaction_ml_score(frequency, structuring, unusual, risk_score)
+    transactions_df = transactions_df.assign(
+        frequency_pattern=frequency,
+        structuring_pattern=structuring,
+        unusual_pattern=unusual,
+        ml_score=ml_score,
+        flag=transaction_flag(ml_score, transactions_df['is_suspicious'].to_numpy())
+    )
+
+    # Sample connections
+    connections_df = pd.DataFrame(generate_connections(officials, mining_locations, seed=int(rng.integers(2**32))))
+
+    # Land change analysis
+    land_change = pd.DataFrame({
+        'mine_id': mining_locations['id'],
+        'name': mining_locations['name'],
+        'district': mining_locations['district'],
+        'area_2020': mining_locations['area_2020'],
+        'area_2021': [round(mining_locations['area_2020'][i] + (mining_locations['area_2023'][i] - mining_locations['area_2020'][i]) * 0.3) for i in range(len(mining_locations))],
+        'area_2022': [round(mining_locations['area_2020'][i] + (mining_locations['area_2023'][i] - mining_locations['area_2020'][i]) * 0.7) for i in range(len(mining_locations))],
+        'area_2023': mining_locations['area_2023'],
+        'percent_change': [(mining_locations['area_2023'][i] - mining_locations['area_2020'][i]) / mining_locations['area_2020'][i] * 100 for i in range(len(mining_locations))],
+        'anomaly_score': mining_locations['land_change_anomaly'],
+        'deforestation_impact': [round(rng.uniform(0.5, 0.9) * (mining_locations['area_2023'][i] - mining_locations['area_2020'][i])) for i in range(len(mining_locations))],
+        'water_impact': [round(rng.uniform(0.3, 0.7) * (mining_locations['area_2023'][i] - mining_locations['area_2020'][i])) for i in range(len(mining_locations))],
+        'license_compliance': [rng.choice(['Sesuai', 'Tidak Sesuai', 'Perlu Verifikasi'], p=[0.4, 0.3, 0.3]) for _ in range(len(mining_locations))]
+    })
+
+    # Integrated risk assessment
+    integrated_risk = compute_integrated_risk(mining_locations, financial_data, officials, transactions_df)
+
+    return mining_locations, financial_data, officials, transactions_df, connections_df, land_change, integrated_risk
+
+DATA_SOURCES = {
+    'sample': load_sample_data,
+}
+
+# Shared across all sessions of this server process
+@st.cache_resource(ttl=DATA_CACHE_TTL, max_entries=8, show_spinner="Memuat data...")
+def _load_cached_data(source, version, seed):
+    return DATA_SOURCES[source](seed=seed)
+
+# Shallow copies of the cached frames; the app turns on pandas copy-on-write
+# so a page's writes never reach the cache
+def get_data(source=DATA_SOURCE, version=DATA_VERSION, seed=DATA_SEED):
+    return tuple(frame.copy(deep=False) for frame in _load_cached_data(source, version, seed))
+
+# Bumped by invalidate_data_cache. It is part of data_version(), so every
+# cache keyed on it (concession join, map layers, transaction index, live
+# transactions, network analysis and queries, models) rebuilds from the
+# reloaded frames instead of serving objects built from the old ones.
+_data_generation = 0
+
+def data_version(source=DATA_SOURCE, version=DATA_VERSION, seed=DATA_SEED):
+    return f"{source}:{version}:{seed}:{_data_generation}"
+
+def invalidate_data_cache():
+    global _data_generation
+    _data_generation += 1
+    _load_cached_data.clear()
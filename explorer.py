@@ -0,0 +1,287 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Columns of the transaction explorer's multiselect filters
+FILTER_COLUMNS = ['district', 'position', 'transaction_type']
+# Columns of the paginated transaction table, and the ones its search box matches
+TABLE_COLUMNS = ['date', 'official_name', 'position', 'district', 'amount', 'transaction_type', 'counterparty', 'ml_score', 'flag']
+SEARCH_COLUMNS = ['official_name', 'counterparty', 'district', 'position', 'transaction_type']
+TABLE_PAGE_SIZE = 100
+# Flags as shown in the table, coloured like the charts
+FLAG_LABELS = {'Suspicious': '🔴 Suspicious', 'Normal': '🟢 Normal'}
+
+def _codes(column):
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes, categories = column.cat.codes.to_numpy(), column.cat.categories
+    else:
+        codes, categories = pd.factorize(column, sort=True)
+    dtype = np.int16 if len(categories) < np.iinfo(np.int16).max else np.int32
+    return codes.astype(dtype), pd.Index(categories)
+
+# Filter criteria: a tuple of selected values per FILTER_COLUMNS (empty = all)
+# and an inclusive (start, end) date range
+class TransactionFilter:
+    def __init__(self, selections, start, end):
+        self.selections = {column: frozenset(selections.get(column, ())) for column in FILTER_COLUMNS}
+        self.start = np.datetime64(start, 'D')
+        self.end = np.datetime64(end, 'D')
+
+    # True if every row matching self also matches other
+    def narrows(self, other):
+        return self.start >= other.start and self.end <= other.end and all(
+            not other.selections[column] or (self.selections[column] and self.selections[column] <= other.selections[column])
+            for column in FILTER_COLUMNS
+        )
+
+# Result of TransactionIndex.filter. positions index the date-sorted rows
+# (in no particular order); rows are the matching positions in the original frame.
+class TransactionSelection:
+    def __init__(self, index, criteria, positions):
+        self.index = index
+        self.criteria = criteria
+        self.positions = positions
+
+    @property
+    def rows(self):
+        return self.index.order[self.positions]
+
+    def __len__(self):
+        return len(self.positions)
+
+# Rows sorted by date, with integer codes for the filter columns and, per
+# column, the rows grouped by category (date-sorted within each group). A
+# filter starts from the groups of its most selective column, cut to the date
+# range by binary search, and checks the other columns by code lookup, so it
+# never scans the frame or builds Python dates.
+class TransactionIndex:
+    def __init__(self, transactions):
+        self.transactions = transactions
+        days = transactions['date'].to_numpy().astype('datetime64[D]')
+        position_dtype = np.int32 if len(days) < np.iinfo(np.int32).max else np.int64
+        self.order = np.argsort(days, kind='stable').astype(position_dtype)
+        self.days = days[self.order]
+        self.codes = {}
+        self.categories = {}
+        # column -> (positions grouped by code, group start offsets, their days)
+        self.groups = {}
+        for column in FILTER_COLUMNS:
+            codes, categories = _codes(transactions[column])
+            codes = codes[self.order]
+            grouped = np.argsort(codes, kind='stable').astype(position_dtype)
+            starts = np.concatenate([[0], np.cumsum(np.bincount(codes[codes >= 0], minlength=len(categories)))])
+            # Rows with a missing value (code -1) sort first; skip them
+            grouped = grouped[len(grouped) - starts[-1]:]
+            self.codes[column] = codes
+            self.categories[column] = categories
+            self.groups[column] = (grouped, starts, self.days[grouped])
+
+    def __len__(self):
+        return len(self.order)
+
+    # Codes (date-sorted) and sorted categories of a text column; the filter
+    # columns are coded up front, the table's other text columns on first use
+    def column_codes(self, column):
+        if column not in self.codes:
+            codes, categories = _codes(self.transactions[column])
+            self.categories[column] = categories
+            self.codes[column] = codes[self.order]
+        return self.codes[column], self.categories[column]
+
+    @property
+    def date_range(self):
+        return self.days[0].astype(object), self.days[-1].astype(object)
+
+    def _codes_of(self, column, values):
+        codes = self.categories[column].get_indexer(list(values))
+        return codes[codes >= 0]
+
+    # (start, stop) slices of the column's groups for the selected codes within the date range
+    def _group_slices(self, column, codes, start, end):
+        _, starts, days = self.groups[column]
+        return [
+            (starts[code] + np.searchsorted(days[starts[code]:starts[code + 1]], start, 'left'),
+             starts[code] + np.searchsorted(days[starts[code]:starts[code + 1]], end, 'right'))
+            for code in codes
+        ]
+
+    # Matching rows for criteria. When criteria only narrows the previous
+    # selection, its rows are filtered again instead of the index, unless the
+    # index groups of the most selective column are smaller still.
+    def filter(self, criteria, previous=None):
+        selected = {column: self._codes_of(column, values) for column, values in criteria.selections.items() if values}
+        reuse = previous is not None and previous.index is self and criteria.narrows(previous.criteria)
+        driver = None
+        if selected:
+            slices = {column: self._group_slices(column, codes, criteria.start, criteria.end) for column, codes in selected.items()}
+            sizes = {column: sum(stop - start for start, stop in slices[column]) for column in slices}
+            driver = min(sizes, key=sizes.get)
+            reuse = reuse and len(previous.positions) <= sizes[driver]
+        if reuse:
+            positions = previous.positions
+            if criteria.start != previous.criteria.start or criteria.end != previous.criteria.end:
+                days = self.days[positions]
+                positions = positions[(days >= criteria.start) & (days <= criteria.end)]
+            checks = [column for column in selected if criteria.selections[column] != previous.criteria.selections[column]]
+        elif driver is not None:
+            grouped = self.groups[driver][0]
+            positions = np.concatenate([grouped[:0]] + [grouped[start:stop] for start, stop in slices[driver]])
+            checks = [column for column in selected if column != driver]
+        else:
+            lo = np.searchsorted(self.days, criteria.start, 'left')
+            hi = np.searchsorted(self.days, criteria.end, 'right')
+            positions = np.arange(lo, hi, dtype=self.order.dtype)
+            checks = []
+        for column in checks:
+            codes = self.codes[column][positions]
+            if len(selected[column]) <= 4:
+                mask = np.zeros(len(positions), dtype=bool)
+                for code in selected[column]:
+                    mask |= codes == code
+            else:
+                table = np.zeros(len(self.categories[column]), dtype=bool)
+                table[selected[column]] = True
+                mask = table[codes]
+            positions = positions[mask]
+        return TransactionSelection(self, criteria, positions)
+
+    # Positions whose text columns contain text (case-insensitive). Only the
+    # distinct values are searched; rows match through their codes.
+    def search(self, positions, text, columns=SEARCH_COLUMNS):
+        if not text:
+            return positions
+        mask = np.zeros(len(positions), dtype=bool)
+        for column in columns:
+            codes, categories = self.column_codes(column)
+            # One extra False slot so missing values (code -1) never match
+            hits = np.append(np.asarray(categories.astype(str).str.contains(text, case=False, regex=False)), False)
+            mask |= hits[codes[positions]]
+        return positions[mask]
+
+    # Positions ordered by a table column, compared on its raw typed values
+    def sort(self, positions, column, ascending=True):
+        if column == 'date':
+            # Positions index the date-sorted rows already
+            ordered = np.sort(positions, kind='stable')
+        else:
+            if self.transactions[column].dtype.kind in 'biufcmM':
+                keys = self.transactions[column].to_numpy()[self.order[positions]]
+            else:
+                keys = self.column_codes(column)[0][positions]
+            ordered = positions[np.argsort(keys, kind='stable')]
+        return ordered if ascending else ordered[::-1]
+
+    # Raw rows of one table page; nothing outside it is read or formatted
+    def page(self, positions, page, page_size=TABLE_PAGE_SIZE, columns=TABLE_COLUMNS):
+        return self.transactions.iloc[self.order[positions[page * page_size:(page + 1) * page_size]]][columns]
+
+# Display formatting of one table page, as text columns. Suspicious rows are
+# marked in the flag column rather than highlighted with a pandas Styler,
+# which imports matplotlib.
+def format_page(page):
+    return page.assign(
+        date=page['date'].dt.strftime('%d %b %Y'),
+        amount=page['amount'].map('Rp {:,.0f}'.format),
+        ml_score=page['ml_score'].map('{:.2f}'.format),
+        flag=page['flag'].map(FLAG_LABELS)
+    )
+
+# Cells of the aggregate cube and their measures. The histograms use fixed
+# bin edges so cells from different batches can simply be added up. Ingested
+# amounts have no upper bound, so the amount histogram ends in an open bin.
+CUBE_KEYS = ['month', 'district', 'position', 'transaction_type', 'flag', 'official_id', 'official_name']
+HISTOGRAM_BINS = {
+    'amount': np.append(np.linspace(0, 100_000, 51), np.inf),
+    'ml_score': np.linspace(0.0, 1.0, 51)
+}
+HISTOGRAM_FORMATS = {
+    'amount': lambda value: f"{value:,.0f}".replace(',', '.'),
+    'ml_score': '{:.2f}'.format
+}
+
+def _histogram_columns(measure):
+    return [f"{measure}_bin_{i}" for i in range(len(HISTOGRAM_BINS[measure]) - 1)]
+
+# One row per cube cell: amount sum, transaction count, ml_score sum and the
+# per-bin counts of both histograms
+def aggregate_transactions(transactions):
+    keyed = transactions.assign(month=transactions['date'].to_numpy().astype('datetime64[M]').astype('datetime64[ns]'))
+    grouped = keyed.groupby(CUBE_KEYS, observed=True)
+    cells = grouped.agg(amount=('amount', 'sum'), count=('amount', 'size'), ml_score=('ml_score', 'sum'))
+    cell = grouped.ngroup().to_numpy()
+    histograms = []
+    for measure, edges in HISTOGRAM_BINS.items():
+        n_bins = len(edges) - 1
+        bins = np.clip(np.searchsorted(edges, keyed[measure].to_numpy(), 'right') - 1, 0, n_bins - 1)
+        counts = np.bincount(cell * n_bins + bins, minlength=len(cells) * n_bins).reshape(len(cells), n_bins)
+        histograms.append(pd.DataFrame(counts, index=cells.index, columns=_histogram_columns(measure)))
+    return pd.concat([cells] + histograms, axis=1).reset_index()
+
+# Materialized aggregates of the transactions by (month, district, position,
+# type, flag, official). The explorer's charts roll up from these cells; only
+# the partial months at the ends of a date range are read from raw rows.
+class TransactionCube:
+    def __init__(self, transactions):
+        self.cells = aggregate_transactions(transactions)
+
+    # Adds a batch of new transactions without re-reading the old ones
+    def append(self, transactions):
+        if len(transactions):
+            self.cells = pd.concat([self.cells, aggregate_transactions(transactions)]).groupby(
+                CUBE_KEYS, observed=True, as_index=False
+            ).sum()
+
+    # Cells matching criteria. rows_for(criteria) must return the raw
+    # transactions for a range inside one month; it is only called for the
+    # partial months at either end of the date range.
+    def rollup(self, criteria, rows_for=None):
+        cells = self.cells
+        for column, values in criteria.selections.items():
+            if values:
+                cells = cells[cells[column].isin(values)]
+        month_start = criteria.start.astype('datetime64[M]')
+        month_end = criteria.end.astype('datetime64[M]')
+        first_full = month_start if criteria.start == month_start.astype('datetime64[D]') else month_start + 1
+        last_full = month_end if criteria.end == (month_end + 1).astype('datetime64[D]') - 1 else month_end - 1
+        months = cells['month'].to_numpy().astype('datetime64[M]')
+        parts = [cells[(months >= first_full) & (months <= last_full)]]
+        partial = []
+        if first_full != month_start:
+            partial.append((criteria.start, min(criteria.end, (month_start + 1).astype('datetime64[D]') - 1)))
+        # A range inside one month is a single partial; the start one covers it
+        # unless the range starts on the 1st
+        if last_full != month_end and (month_end != month_start or first_full == month_start):
+            partial.append((month_end.astype('datetime64[D]'), criteria.end))
+        for start, end in partial:
+            rows = rows_for(TransactionFilter(criteria.selections, start, end))
+            if len(rows):
+                parts.append(aggregate_transactions(rows))
+        return pd.concat(parts, ignore_index=True)
+
+# Labels of a measure's bins, e.g. '2.000–4.000' and '> 100.000' for the open one
+def histogram_labels(measure):
+    edges, fmt = HISTOGRAM_BINS[measure], HISTOGRAM_FORMATS[measure]
+    return [
+        f"{fmt(lo)}–{fmt(hi)}" if np.isfinite(hi) else f"> {fmt(lo)}"
+        for lo, hi in zip(edges[:-1], edges[1:])
+    ]
+
+# Long-form histogram (bin centre, bin label, flag, count) of rolled-up cells;
+# an open last bin is centred one bin width past the last finite edge
+def cube_histogram(cells, measure, by='flag'):
+    edges = HISTOGRAM_BINS[measure]
+    centres = (edges[:-1] + edges[1:]) / 2
+    if not np.isfinite(edges[-1]):
+        centres[-1] = edges[-2] + (edges[-2] - edges[-3]) / 2
+    counts = cells.groupby(by)[_histogram_columns(measure)].sum()
+    return pd.DataFrame({
+        by: np.repeat(counts.index.to_numpy(), len(edges) - 1),
+        measure: np.tile(centres, len(counts)),
+        'bin': np.tile(histogram_labels(measure), len(counts)),
+        'count': counts.to_numpy().ravel()
+    })
+
+# Built once per data version (and batch of streamed rows), shared by every session
+@st.cache_resource(show_spinner=False, max_entries=2)
+def transaction_index(version, _transactions):
+    return TransactionIndex(_transactions)
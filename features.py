@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+# Windows (in days, including the transaction's own day) of the pattern features
+FREQUENCY_WINDOW_DAYS = 7
+VELOCITY_WINDOW_DAYS = 30
+STRUCTURING_WINDOW_DAYS = 30
+HISTORY_DAYS = max(FREQUENCY_WINDOW_DAYS, VELOCITY_WINDOW_DAYS, STRUCTURING_WINDOW_DAYS)
+# Transactions in a week at which the frequency count saturates
+FREQUENCY_SATURATION = 5
+# Amounts in this fraction below the reporting threshold count as structuring,
+# and this many of them in a window is a full cluster
+REPORTING_THRESHOLD = 100_000
+STRUCTURING_BAND = 0.1
+STRUCTURING_SATURATION = 3
+# Earlier transactions an official needs before the baseline is trusted
+BASELINE_MIN_TRANSACTIONS = 5
+# Officials per chunk handed to a worker
+FEATURE_CHUNK_OFFICIALS = 2_000
+
+# Pattern features of transactions sorted by (official, day). Windows are
+# binary searches over the combined (official, day) key, so no per-official
+# groups are built. prior_* are each row's official baseline (count, sum and
+# sum of squares of amounts) from days before the arrays start.
+def window_features(official, day, amount, prior_count=0, prior_sum=0.0, prior_sumsq=0.0):
+    n = len(official)
+    if n == 0:
+        return np.empty(0), np.empty(0), np.empty(0)
+    day = day - day.min()
+    key = official.astype(np.int64) * (1 << 32) + day
+
+    def in_window(keys, days):
+        return np.searchsorted(keys, key, 'right') - np.searchsorted(keys, key - (days - 1), 'left')
+
+    count_week = in_window(key, FREQUENCY_WINDOW_DAYS)
+    count_month = in_window(key, VELOCITY_WINDOW_DAYS)
+    velocity = (count_week / FREQUENCY_WINDOW_DAYS) / (count_month / VELOCITY_WINDOW_DAYS)
+    max_velocity = VELOCITY_WINDOW_DAYS / FREQUENCY_WINDOW_DAYS
+    frequency = 0.5 * np.clip(count_week / FREQUENCY_SATURATION, 0.0, 1.0) + 0.5 * np.clip(
+        (velocity - 1) / (max_velocity - 1), 0.0, 1.0
+    )
+
+    floor = REPORTING_THRESHOLD * (1 - STRUCTURING_BAND)
+    in_band = (amount >= floor) & (amount < REPORTING_THRESHOLD)
+    cluster = in_window(key[in_band], STRUCTURING_WINDOW_DAYS)
+    structuring = np.where(in_band, (amount - floor) / (REPORTING_THRESHOLD - floor), 0.0) * np.clip(
+        cluster / STRUCTURING_SATURATION, 0.0, 1.0
+    )
+
+    # Baseline of each row: the official's transactions on earlier days
+    amount = amount.astype(float)
+    first = np.searchsorted(key, official.astype(np.int64) * (1 << 32), 'left')
+    before = np.searchsorted(key, key, 'left')
+    cumulative = np.zeros((3, n + 1))
+    cumulative[0, 1:] = 1
+    cumulative[1, 1:] = amount
+    cumulative[2, 1:] = amount ** 2
+    cumulative = np.cumsum(cumulative, axis=1)
+    count = cumulative[0, before] - cumulative[0, first] + prior_count
+    total = cumulative[1, before] - cumulative[1, first] + prior_sum
+    total_sq = cumulative[2, before] - cumulative[2, first] + prior_sumsq
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / count
+        std = np.sqrt(np.maximum(total_sq / count - mean ** 2, 0.0))
+        deviation = np.abs(amount - mean) / np.where(std > 0, std, np.maximum(mean, 1.0))
+    unusual = np.where(count >= BASELINE_MIN_TRANSACTIONS, np.clip(deviation / 3, 0.0, 1.0), 0.0)
+    return frequency, structuring, unusual
+
+def _chunk_features(official, day, amount):
+    order = np.lexsort((day, official))
+    features = window_features(official[order], day[order], amount[order])
+    result = np.empty((3, len(order)))
+    result[:, order] = features
+    return result
+
+def _days(dates):
+    return pd.to_datetime(dates).to_numpy().astype('datetime64[D]').astype(np.int64)
+
+# (frequency, structuring, unusual) for every transaction, in row order.
+# Officials are independent, so they are split into chunks that run in a
+# process pool; each chunk only ships its three columns to the worker.
+def compute_pattern_features(transactions, n_jobs=-1, chunk_officials=FEATURE_CHUNK_OFFICIALS):
+    official_codes, _ = pd.factorize(transactions['official_id'])
+    day = _days(transactions['date'])
+    amount = transactions['amount'].to_numpy()
+    chunk = official_codes // chunk_officials
+    order = np.argsort(chunk, kind='stable')
+    bounds = np.searchsorted(chunk[order], np.arange(chunk.max() + 2 if len(chunk) else 1))
+    parts = [order[start:stop] for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+    results = Parallel(n_jobs=n_jobs if len(parts) > 1 else 1, backend='loky')(
+        delayed(_chunk_features)(official_codes[rows], day[rows], amount[rows]) for rows in parts
+    )
+    features = np.empty((3, len(transactions)))
+    for rows, result in zip(parts, results):
+        features[:, rows] = result
+    return features[0], features[1], features[2]
+
+# Running state for computing the features of new transactions without
+# re-reading the history: the last HISTORY_DAYS days of rows plus, per
+# official, the baseline sums of everything older. Rows older than the kept
+# history are scored against it as far as it goes.
+class FeatureState:
+    def __init__(self):
+        self.history = pd.DataFrame({
+            'official_id': pd.Series(dtype=np.int64), 'day': pd.Series(dtype=np.int64), 'amount': pd.Series(dtype=float)
+        })
+        self.baseline = pd.DataFrame(columns=['count', 'sum', 'sumsq'], dtype=float)
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        state = cls()
+        state.update(transactions)
+        return state
+
+    # Features of new (in row order), then folds them into the state
+    def update(self, new):
+        rows = pd.DataFrame({
+            'official_id': new['official_id'].to_numpy(), 'day': _days(new['date']),
+            'amount': new['amount'].to_numpy(dtype=float)
+        })
+        combined = pd.concat([self.history, rows], ignore_index=True)
+        is_new = np.arange(len(combined)) >= len(self.history)
+        order = np.lexsort((combined['day'].to_numpy(), combined['official_id'].to_numpy()))
+        official = combined['official_id'].to_numpy()[order]
+        prior = self.baseline.reindex(official).fillna(0.0)
+        features = window_features(
+            official, combined['day'].to_numpy()[order], combined['amount'].to_numpy()[order],
+            prior['count'].to_numpy(), prior['sum'].to_numpy(), prior['sumsq'].to_numpy()
+        )
+        result = np.empty((3, len(combined)))
+        result[:, order] = features
+
+        horizon = combined['day'].max() - HISTORY_DAYS + 1 if len(combined) else 0
+        expired = combined[combined['day'] < horizon]
+        if len(expired):
+            sums = expired.assign(count=1.0, sumsq=expired['amount'] ** 2).groupby('official_id')[['count', 'amount', 'sumsq']].sum()
+            sums = sums.rename(columns={'amount': 'sum'})
+            self.baseline = self.baseline.add(sums, fill_value=0.0)
+        self.history = combined[combined['day'] >= horizon].reset_index(drop=True)
+        return result[0, is_new], result[1, is_new], result[2, is_new]
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+import streamlit as st
+from shapely.geometry import box
+
+# Concession polygons shipped with the app (EPSG:4326, AREA in km²)
+CONCESSIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mining_area_idn.geojson')
+
+# Binary cache of the polygon layer: one directory per source-file hash with
+# rounded, memory-mappable coordinate/offset arrays per simplification tolerance
+CONCESSION_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'concessions')
+# Douglas-Peucker tolerances in degrees; 0.0 is the unsimplified layer
+SIMPLIFY_TOLERANCES = [0.0, 0.0005, 0.002, 0.01]
+COORDINATE_DECIMALS = 6
+# A mine outside every polygon is still joined to the nearest one within this
+# many degrees (about 3 km); farther away it has no concession
+CONCESSION_MAX_DISTANCE = 0.03
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _tolerance_name(tolerance):
+    return f"tol_{tolerance:g}"
+
+# Largest tolerance that stays under one screen pixel at this zoom level
+def tolerance_for_zoom(zoom):
+    pixel = 360 / (256 * 2 ** zoom)
+    return max(tolerance for tolerance in SIMPLIFY_TOLERANCES if tolerance <= pixel)
+
+def build_concession_cache(path, layer_dir):
+    source = gpd.read_file(path)
+    geometry = source.geometry.values
+    tmp_dir = tempfile.mkdtemp(prefix='.build-', dir=os.path.dirname(layer_dir))
+    meta = {'source_hash': os.path.basename(layer_dir), 'crs': source.crs.to_string(), 'layers': {}}
+    for tolerance in SIMPLIFY_TOLERANCES:
+        simplified = shapely.simplify(geometry, tolerance, preserve_topology=True) if tolerance else geometry
+        simplified = shapely.transform(simplified, lambda coords: np.round(coords, COORDINATE_DECIMALS))
+        geometry_type, coords, offsets = shapely.to_ragged_array(simplified)
+        name = _tolerance_name(tolerance)
+        np.save(os.path.join(tmp_dir, f"{name}_coords.npy"), coords)
+        for i, offset in enumerate(offsets):
+            np.save(os.path.join(tmp_dir, f"{name}_offsets{i}.npy"), offset)
+        meta['layers'][name] = {'geometry_type': int(geometry_type), 'n_offsets': len(offsets)}
+    properties = source.drop(columns=source.geometry.name)
+    np.savez_compressed(os.path.join(tmp_dir, 'properties.npz'), **{
+        column: values.to_numpy() if values.dtype.kind in 'biuf' else values.astype(str).to_numpy(dtype=str)
+        for column, values in properties.items()
+    })
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    try:
+        os.replace(tmp_dir, layer_dir)
+    except OSError:
+        # Another worker finished the same build first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+# Returns the cache directory for the current contents of path, building it
+# (and dropping caches of older versions of the file) when the hash is new.
+def ensure_concession_cache(path=CONCESSIONS_PATH, cache_dir=CONCESSION_CACHE_DIR):
+    layer_dir = os.path.join(cache_dir, _file_hash(path))
+    if not os.path.exists(os.path.join(layer_dir, 'meta.json')):
+        os.makedirs(cache_dir, exist_ok=True)
+        build_concession_cache(path, layer_dir)
+        for entry in os.listdir(cache_dir):
+            if entry != os.path.basename(layer_dir) and not entry.startswith('.build-'):
+                shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+    return layer_dir
+
+def read_concessions(path=CONCESSIONS_PATH, tolerance=0.0, cache_dir=CONCESSION_CACHE_DIR):
+    try:
+        layer_dir = ensure_concession_cache(path, cache_dir)
+    except OSError:
+        # Read-only checkout: parse the GeoJSON directly
+        concessions = gpd.read_file(path)
+        if tolerance:
+            concessions = concessions.set_geometry(concessions.geometry.simplify(tolerance))
+        concessions.sindex
+        return concessions
+
+    with open(os.path.join(layer_dir, 'meta.json')) as f:
+        meta = json.load(f)
+    name = _tolerance_name(tolerance)
+    layer = meta['layers'][name]
+    coords = np.load(os.path.join(layer_dir, f"{name}_coords.npy"), mmap_mode='r')
+    offsets = tuple(
+        np.load(os.path.join(layer_dir, f"{name}_offsets{i}.npy"), mmap_mode='r') for i in range(layer['n_offsets'])
+    )
+    geometry = shapely.from_ragged_array(shapely.GeometryType(layer['geometry_type']), coords, offsets)
+    with np.load(os.path.join(layer_dir, 'properties.npz')) as properties:
+        columns = {
+            column: values if values.dtype.kind in 'biuf' else values.astype(object)
+            for column, values in properties.items()
+        }
+    concessions = gpd.GeoDataFrame(columns, geometry=geometry, crs=meta['crs'])
+    # Touching sindex builds the STRtree now instead of on the first query
+    concessions.sindex
+    return concessions
+
+# Loaded once per server process and shared by every session. The file's
+# mtime is part of the key so an edited source is picked up (and re-hashed).
+@st.cache_resource(show_spinner="Memuat poligon konsesi...")
+def _load_concessions(path, mtime, tolerance):
+    return read_concessions(path, tolerance)
+
+def load_concessions(path=CONCESSIONS_PATH, tolerance=0.0):
+    return _load_concessions(path, os.path.getmtime(path), tolerance)
+
+def concessions_version(path=CONCESSIONS_PATH):
+    return str(os.path.getmtime(path))
+
+# Point-in-polygon lookup for one or many points. Returns (point_idx, polygon_idx)
+# pairs, polygon_idx being positional into concessions.
+def concessions_at(concessions, lon, lat):
+    points = gpd.points_from_xy(np.atleast_1d(lon), np.atleast_1d(lat))
+    return concessions.sindex.query(points, predicate='within')
+
+def concessions_in_bbox(concessions, min_lon, min_lat, max_lon, max_lat):
+    return concessions.iloc[concessions.sindex.query(box(min_lon, min_lat, max_lon, max_lat), predicate='intersects')]
+
+# Joins each mine to the concession polygon containing it. Mines outside every
+# polygon fall back to the nearest one (within max_distance degrees, if given);
+# unmatched mines keep a NaN area and no concession_match.
+def join_concessions(mining_locations, concessions, max_distance=None):
+    points = gpd.points_from_xy(mining_locations['lon'], mining_locations['lat'])
+    n = len(mining_locations)
+    polygon = np.full(n, -1, dtype=np.int64)
+    match = np.full(n, None, dtype=object)
+    distance = np.full(n, np.nan)
+
+    point_idx, polygon_idx = concessions.sindex.query(points, predicate='within')
+    # A point on a shared border can fall in two polygons; keep the first
+    point_idx, first = np.unique(point_idx, return_index=True)
+    polygon[point_idx] = polygon_idx[first]
+    match[point_idx] = 'Di dalam'
+    distance[point_idx] = 0.0
+
+    outside = np.flatnonzero(polygon < 0)
+    if len(outside):
+        (point_idx, polygon_idx), nearest_distance = concessions.sindex.nearest(
+            points[outside], max_distance=max_distance, return_distance=True
+        )
+        point_idx, first = np.unique(point_idx, return_index=True)
+        polygon[outside[point_idx]] = polygon_idx[first]
+        match[outside[point_idx]] = 'Terdekat'
+        distance[outside[point_idx]] = nearest_distance[first]
+
+    matched = polygon >= 0
+    return pd.DataFrame({
+        'mine_id': mining_locations['id'].to_numpy(),
+        'concession_index': polygon,
+        'concession_fid': np.where(matched, concessions['fid'].to_numpy()[polygon], -1),
+        'concession_area': np.where(matched, concessions['AREA'].to_numpy()[polygon], np.nan),
+        'concession_match': match,
+        'concession_distance': distance
+    })
+
+# The mine/concession join only changes with the data version
+@st.cache_resource(show_spinner=False)
+def mine_concessions(version, _mining_locations, path=CONCESSIONS_PATH):
+    return join_concessions(_mining_locations, load_concessions(path), max_distance=CONCESSION_MAX_DISTANCE)
+
+# Polygons of the joined concessions, ready for folium.GeoJson. Pass a
+# simplified layer (same row order) to keep the map payload small.
+def concession_footprints(concessions, footprints):
+    indices = np.unique(footprints.loc[footprints['concession_index'] >= 0, 'concession_index'])
+    return concessions.iloc[indices][['fid', 'AREA', 'geometry']]
+
+# GeoJSON (string) of the features intersecting bbox; polygons are clipped to
+# it so a zoomed-in view does not carry whole concessions along.
+def viewport_geojson(features, bbox):
+    selected = features.iloc[features.sindex.query(box(*bbox), predicate='intersects')]
+    if len(selected) and not (selected.geom_type == 'Point').all():
+        selected = selected.set_geometry(shapely.clip_by_rect(selected.geometry.values, *bbox))
+    return selected.to_json(drop_id=True)
+
+# Viewport provider for the concession polygons: simplification follows the zoom
+def concession_viewport_provider(path=CONCESSIONS_PATH):
+    layers = {
+        tolerance: load_concessions(path, tolerance)[['fid', 'AREA', 'geometry']]
+        for tolerance in SIMPLIFY_TOLERANCES
+    }
+    return lambda bbox, zoom: viewport_geojson(layers[tolerance_for_zoom(zoom)], bbox)
@@ -0,0 +1,943 @@
+import hashlib
+import json
+import os
+import string
+import threading
+
+import joblib
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import streamlit as st
+
+
+# Above this many nodes betweenness is estimated from BETWEENNESS_SAMPLES
+# source nodes instead of all of them (Brandes with k samples)
+BETWEENNESS_EXACT_MAX_NODES = 2_000
+BETWEENNESS_SAMPLES = 256
+# Sources whose BFS run together as the columns of one dense frontier matrix
+BETWEENNESS_BATCH_SIZE = 64
+# Above this many nodes the average clustering is estimated by sampling
+CLUSTERING_EXACT_MAX_NODES = 50_000
+CLUSTERING_TRIALS = 10_000
+# Communities are kept per data version here, so labels survive restarts
+COMMUNITY_STORE_DIR = os.environ.get(
+    'COMMUNITY_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'communities')
+)
+# Share of the edges added or removed since the last full computation above
+# which communities and betweenness are recomputed instead of updated
+NETWORK_DRIFT_THRESHOLD = 0.05
+# Rounds of local moves spreading out from the nodes an update touched
+LOCAL_MOVE_MAX_ROUNDS = 10
+EIGENVECTOR_MAX_ITER = 1000
+EIGENVECTOR_TOL = 1e-6
+GRAPH_SEED = 42
+# Edge types of the connections, and the most nodes a query returns (a k-hop
+# neighbourhood past it is cut within its last level)
+EDGE_TYPES = ['Official-Official', 'Official-Mine', 'Official-Company']
+QUERY_MAX_NODES = 500
+# Candidates a node search box offers, instead of every node of the graph
+NODE_SEARCH_LIMIT = 50
+# Recent searches kept per index, so reruns with the same text are lookups
+NODE_SEARCH_CACHE_SIZE = 256
+# Vendored vis-network and tom-select under static/lib, served by Streamlit's
+# static file serving (server.enableStaticServing) at app/static/lib instead of
+# being inlined into every page. NETWORK_ASSETS=cdn links the pinned CDN builds
+# pyvis uses instead, for deployments without static serving.
+NETWORK_ASSETS = os.environ.get('NETWORK_ASSETS', 'static')
+NETWORK_STATIC_URL = 'app/static/lib'
+NETWORK_STATIC_FILES = [
+    'vis-9.1.2/vis-network.css', 'vis-9.1.2/vis-network.min.js',
+    'tom-select/tom-select.css', 'tom-select/tom-select.complete.min.js'
+]
+# Streamlit serves static JS and CSS as text/plain with nosniff, which browsers
+# refuse to run or apply from src/href, so the page fetches the files (relative
+# to the app's URL, which the srcdoc iframe shares) and inlines them in order
+NETWORK_STATIC_ASSETS = string.Template("""<script>
+function loadAssets(done) {
+    var files = $files;
+    Promise.all(files.map(function (file) {
+        return fetch(file).then(function (response) {
+            if (!response.ok) { throw new Error(file + ': ' + response.status); }
+            return response.text();
+        });
+    })).then(function (texts) {
+        texts.forEach(function (text, i) {
+            var tag = document.createElement(files[i].slice(-4) === '.css' ? 'style' : 'script');
+            tag.textContent = text;
+            document.head.appendChild(tag);
+        });
+        done();
+    }).catch(function (error) {
+        document.getElementById('network').textContent = 'Aset jaringan tidak dapat dimuat (' + error.message + ')';
+    });
+}
+</script>""")
+NETWORK_CDN_ASSETS = """<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/dist/vis-network.min.css" integrity="sha512-WgxfT5LWjfszlPHXRmBWHkV2eceiWTOBvrKCNbdgDYTHrT2AeLCGbF4sZlZw3UMN3WtL0tGUoIAKsu8mllg/XA==" crossorigin="anonymous" referrerpolicy="no-referrer" />
+<script src="https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js" integrity="sha512-LnvoEWDFrqGHlHmDD2101OrLcbsfkrzoSpvtSQtxK3RMnRV0eOkhhBN2dXHKRrUU8p2DGRTk35n4O8nWSVe1mQ==" crossorigin="anonymous" referrerpolicy="no-referrer"></script>
+<link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/tom-select/2.0.0-rc.4/css/tom-select.min.css" integrity="sha512-43fHB3GLgZfz8QXl1RPQ8O66oIgv3po9cJ5erMt1c4QISq9dYb195T3vr5ImnJPXuVroKcGBPXBFKETW8jrPNQ==" crossorigin="anonymous" referrerpolicy="no-referrer" />
+<script src="https://cdnjs.cloudflare.com/ajax/libs/tom-select/2.0.0-rc.4/js/tom-select.complete.js" integrity="sha512-jeF9CfnvzDiw9G9xiksVjxR2lib44Gnovvkv+3CgCG6NXCD4gqlA5nDAVW5WjpA+i+/zKsUWV5xNEbW1X/HH0Q==" crossorigin="anonymous" referrerpolicy="no-referrer"></script>
+<script>function loadAssets(done) { done(); }</script>"""
+NETWORK_HEIGHT = 600
+# Pixels between neighbouring nodes of the precomputed layout. Communities up
+# to LAYOUT_SPRING_MAX_NODES are laid out by force simulation, larger ones
+# (and a community graph that large) spectrally.
+LAYOUT_SPACING = 60
+LAYOUT_SPRING_MAX_NODES = 1_000
+# Graphs up to this many nodes are sent whole; larger ones as one super-node
+# per community, expanded on request
+NETWORK_DETAIL_MAX_NODES = 1_500
+# Below this zoom the browser folds each community into its super-node
+NETWORK_CLUSTER_SCALE = 0.35
+
+NETWORK_TEMPLATE = string.Template("""<html>
+<head>
+<meta charset="utf-8">
+$assets
+<style>
+body { margin: 0; font-family: sans-serif; }
+#network { width: 100%; height: ${height}px; border: 1px solid lightgray; }
+</style>
+</head>
+<body>
+<select id="search" placeholder="Cari node..."></select>
+<div id="network"></div>
+<script>
+loadAssets(function () {
+var nodes = new vis.DataSet($nodes);
+var edges = new vis.DataSet($edges);
+var network = new vis.Network(document.getElementById('network'), {nodes: nodes, edges: edges}, $options);
+var communities = $communities;
+var clustered = false;
+function collapse() {
+    communities.forEach(function (community) {
+        network.cluster({
+            joinCondition: function (node) { return node.community === community.id; },
+            clusterNodeProperties: {
+                id: 'cluster:' + community.id, label: community.label, title: community.title,
+                shape: 'dot', size: 30, color: '#8e44ad'
+            }
+        });
+    });
+    clustered = true;
+}
+function expand() {
+    communities.forEach(function (community) {
+        if (network.isCluster('cluster:' + community.id)) { network.openCluster('cluster:' + community.id); }
+    });
+    clustered = false;
+}
+network.on('zoom', function (params) {
+    if (params.scale < $cluster_scale && !clustered) { collapse(); }
+    else if (params.scale >= $cluster_scale && clustered) { expand(); }
+});
+network.on('doubleClick', function (params) {
+    if (params.nodes.length && network.isCluster(params.nodes[0])) { network.openCluster(params.nodes[0]); }
+});
+new TomSelect('#search', {
+    options: nodes.get().map(function (node) { return {value: node.id, text: node.label}; }),
+    maxOptions: 50,
+    onChange: function (id) {
+        if (id) { network.selectNodes([id]); network.focus(id, {scale: 1.2, animation: true}); }
+    }
+});
+});
+</script>
+</body>
+</html>
+""")
+
+# Officials, companies and their connections as one undirected graph, built
+# from column arrays in bulk. Every node carries its type and risk score
+# (0 for companies).
+def build_graph(officials, mining_data, connections):
+    G = nx.Graph()
+    G.add_nodes_from(zip(officials['name'], (
+        {'type': 'Official', 'position': position, 'district': district, 'risk_score': risk_score}
+        for position, district, risk_score in zip(officials['position'], officials['district'], officials['risk_score'])
+    )))
+    G.add_nodes_from(zip(mining_data['company'], (
+        {'type': 'Company', 'commodity': commodity, 'district': district, 'license_type': license_type, 'risk_score': 0.0}
+        for commodity, district, license_type in zip(mining_data['commodity'], mining_data['district'], mining_data['license_type'])
+    )))
+    G.add_edges_from(zip(connections['source'], connections['target'], (
+        {'weight': weight, 'type': edge_type, 'description': description}
+        for weight, edge_type, description in zip(connections['weight'], connections['type'], connections['description'])
+    )))
+    return G
+
+# Node, Type and Risk Score of each node, joined to the officials registry by
+# name in one indexer lookup; nodes not in it are companies with risk 0. When
+# a name repeats, the last official wins, as it does in build_graph.
+def node_table(nodes, officials):
+    registry = officials.drop_duplicates('name', keep='last')
+    official = pd.Index(registry['name']).get_indexer(nodes)
+    is_official = official >= 0
+    return pd.DataFrame({
+        'Node': nodes,
+        'Type': np.where(is_official, 'Official', 'Company'),
+        'Risk Score': np.where(is_official, registry['risk_score'].to_numpy()[official], 0.0)
+    })
+
+# One row per node of each community ("Komunitas 1", ...) with the node's
+# Type and Risk Score from nodes (a node_table)
+def community_table(communities, nodes):
+    members = np.array([node for community in communities for node in community], dtype=object)
+    labels = np.array([f"Komunitas {i + 1}" for i in range(len(communities))], dtype=object)
+    community = np.repeat(np.arange(len(communities)), [len(members) for members in communities])
+    table = nodes.iloc[pd.Index(nodes['Node']).get_indexer(members)].reset_index(drop=True)
+    table.insert(1, 'Community', labels[community])
+    return table
+
+# Eigenvector centrality by power iteration of (A + I) on the sparse
+# adjacency matrix; the same iteration and normalisation as networkx. start
+# (e.g. the previous result after a few edge changes) shortens the iteration.
+def sparse_eigenvector_centrality(adjacency, max_iter=EIGENVECTOR_MAX_ITER, tol=EIGENVECTOR_TOL, start=None):
+    n = adjacency.shape[0]
+    x = np.full(n, 1.0 / n) if start is None else start / (np.abs(start).sum() or 1.0)
+    for _ in range(max_iter):
+        last = x
+        x = last + adjacency @ last
+        x /= np.linalg.norm(x) or 1.0
+        if np.abs(x - last).sum() < n * tol:
+            return x
+    raise nx.PowerIterationFailedConvergence(max_iter)
+
+# Brandes' dependencies of a batch of sources, run level-synchronously: each
+# BFS level and each dependency step is one sparse-matrix product over the
+# (n, batch) frontier. Returns the dependencies summed over the batch and
+# every node's BFS depth from each source (-1 if unreachable).
+def _dependencies(adjacency, batch):
+    n = adjacency.shape[0]
+    columns = np.arange(len(batch))
+    sigma = np.zeros((n, len(batch)))
+    sigma[batch, columns] = 1.0
+    depth = np.full((n, len(batch)), -1, dtype=np.int32)
+    depth[batch, columns] = 0
+    level = 0
+    while True:
+        reached = adjacency @ np.where(depth == level, sigma, 0.0)
+        new = (depth < 0) & (reached > 0)
+        if not new.any():
+            break
+        level += 1
+        depth[new] = level
+        sigma[new] = reached[new]
+    delta = np.zeros((n, len(batch)))
+    for current in range(level, 0, -1):
+        at_level = depth == current
+        coefficient = np.where(at_level, (1.0 + delta) / np.where(at_level, sigma, 1.0), 0.0)
+        parents = depth == current - 1
+        delta[parents] += sigma[parents] * (adjacency @ coefficient)[parents]
+    delta[batch, columns] = 0.0
+    return delta.sum(axis=1), depth
+
+# Sources of the betweenness estimate: every node, or k seeded random ones
+def betweenness_sources(n, k=None, seed=GRAPH_SEED):
+    return np.arange(n) if k is None or k >= n else np.random.default_rng(seed).choice(n, k, replace=False)
+
+# Summed dependencies normalized as networkx does, scaled by n / k when only
+# k of the n nodes were sources
+def _rescale_betweenness(raw, n, n_sources):
+    betweenness = raw.copy()
+    if n > 2:
+        betweenness /= (n - 1) * (n - 2)
+        if n_sources < n:
+            betweenness *= n / n_sources
+    return betweenness
+
+# Normalized betweenness (as networkx computes it), from all sources or k
+# random ones
+def sparse_betweenness_centrality(adjacency, k=None, seed=GRAPH_SEED, batch_size=BETWEENNESS_BATCH_SIZE):
+    n = adjacency.shape[0]
+    sources = betweenness_sources(n, k, seed)
+    raw = np.zeros(n)
+    for start in range(0, len(sources), batch_size):
+        raw += _dependencies(adjacency, sources[start:start + batch_size])[0]
+    return _rescale_betweenness(raw, n, len(sources))
+
+# Average clustering from triangle counts (diagonal of A^3); sampled above
+# CLUSTERING_EXACT_MAX_NODES where A^2 would no longer fit
+def average_clustering(G, adjacency):
+    if G.number_of_nodes() > CLUSTERING_EXACT_MAX_NODES:
+        return nx.algorithms.approximation.average_clustering(G, trials=CLUSTERING_TRIALS, seed=GRAPH_SEED)
+    degree = np.diff(adjacency.indptr)
+    triangles = np.asarray((adjacency @ adjacency).multiply(adjacency).sum(axis=1)).ravel() / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        clustering = np.where(degree > 1, 2 * triangles / (degree * (degree - 1)), 0.0)
+    return float(clustering.mean()) if len(clustering) else 0.0
+
+# JSON for inline <script>: a '</' inside a title must not close the tag
+def _script_json(value):
+    return json.dumps(value).replace('</', '<\\/')
+
+# Positions of a graph laid out level by level: the graph of communities
+# first, then every community's members in a disc around its centre sized to
+# the community. Each force simulation only sees one community (or the
+# community graph), so the cost grows with the community sizes, not with n^2.
+def multilevel_layout(adjacency, labels, seed=GRAPH_SEED):
+    n = adjacency.shape[0]
+    if n == 0:
+        return np.empty((0, 2))
+    k = labels.max() + 1
+    sizes = np.bincount(labels, minlength=k)
+    membership = sp.csr_array((np.ones(n), (np.arange(n), labels)), shape=(n, k))
+    between = (membership.T @ adjacency @ membership).tocoo()
+    upper = between.row < between.col
+    centers = _local_layout(sp.csr_array((between.data[upper], (between.row[upper], between.col[upper])), shape=(k, k)), seed)
+    # The community discs take about as much room as n nodes would
+    centers *= 1.5 * np.sqrt(n)
+    positions = np.zeros((n, 2))
+    members = np.argsort(labels, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    for community in np.flatnonzero(sizes > 1):
+        rows = members[bounds[community]:bounds[community + 1]]
+        local = _local_layout(adjacency[rows][:, rows], seed)
+        positions[rows] = nx.rescale_layout(local, scale=np.sqrt(len(rows)))
+    return (positions + centers[labels]) * LAYOUT_SPACING
+
+def _local_layout(adjacency, seed):
+    n = adjacency.shape[0]
+    if n == 1:
+        return np.zeros((1, 2))
+    G = nx.from_scipy_sparse_array(sp.csr_array(adjacency + adjacency.T))
+    if n <= LAYOUT_SPRING_MAX_NODES:
+        pos = nx.spring_layout(G, seed=seed)
+    else:
+        pos = nx.spectral_layout(G)
+    return np.array([pos[i] for i in range(n)])
+
+# Labels renumbered 0..k-1 in the order of their current numbers
+def _compact_labels(labels):
+    return np.unique(labels, return_inverse=True)[1].astype(np.int32)
+
+# Louvain partition (seeded, so the same on every run) of the weighted
+# adjacency as one label per node, the largest community first
+def louvain_labels(weights, seed=GRAPH_SEED):
+    communities = nx.community.louvain_communities(nx.from_scipy_sparse_array(weights), weight='weight', seed=seed)
+    communities = sorted(communities, key=len, reverse=True)
+    labels = np.empty(weights.shape[0], dtype=np.int32)
+    labels[np.fromiter((node for community in communities for node in community), dtype=np.int64)] = np.repeat(
+        np.arange(len(communities)), [len(community) for community in communities]
+    )
+    return labels
+
+# Renumbers a fresh partition so each community keeps the number of the
+# previous community it overlaps most (largest overlaps matched first); new
+# communities are numbered after the old ones
+def align_labels(labels, previous):
+    pairs, counts = np.unique(np.column_stack([labels, previous]), axis=0, return_counts=True)
+    mapping = {}
+    taken = set()
+    for (new, old), _ in sorted(zip(pairs.tolist(), counts.tolist()), key=lambda item: -item[1]):
+        if new not in mapping and old not in taken:
+            mapping[new] = old
+            taken.add(old)
+    next_label = previous.max() + 1 if len(previous) else 0
+    for new in np.unique(labels).tolist():
+        if new not in mapping:
+            mapping[new] = next_label
+            next_label += 1
+    lookup = np.zeros(labels.max() + 1, dtype=np.int64)
+    lookup[list(mapping)] = list(mapping.values())
+    return _compact_labels(lookup[labels])
+
+# Louvain's local-moving phase started from an existing partition: only the
+# touched nodes are considered at first, then the neighbours of every node
+# that moved, until nothing moves. Each node goes to the neighbouring
+# community (or a new one of its own) with the highest modularity gain.
+def local_moves(weights, labels, touched, max_rounds=LOCAL_MOVE_MAX_ROUNDS):
+    labels = labels.astype(np.int64)
+    strength = np.asarray(weights.sum(axis=1)).ravel()
+    total = strength.sum()
+    if total == 0:
+        return _compact_labels(labels)
+    # Room for every node to open a community of its own in every round
+    community_strength = np.bincount(labels, weights=strength, minlength=labels.max() + 1 + len(labels) * max_rounds)
+    next_label = labels.max() + 1
+    indptr, indices, data = weights.indptr, weights.indices, weights.data
+    pending = np.unique(touched)
+    for _ in range(max_rounds):
+        moved = []
+        for node in pending.tolist():
+            neighbours = indices[indptr[node]:indptr[node + 1]]
+            links = data[indptr[node]:indptr[node + 1]]
+            links = links[neighbours != node]
+            neighbours = neighbours[neighbours != node]
+            current = labels[node]
+            community_strength[current] -= strength[node]
+            candidates, position = np.unique(labels[neighbours], return_inverse=True)
+            gains = np.bincount(position, weights=links, minlength=len(candidates)) - strength[node] * community_strength[candidates] / total
+            stay = gains[candidates == current][0] if (candidates == current).any() else -strength[node] * community_strength[current] / total
+            best = np.argmax(gains) if len(gains) else None
+            # A community of its own gains 0
+            if best is not None and gains[best] > max(stay, 0.0) + 1e-12:
+                target = candidates[best]
+            elif stay < -1e-12:
+                target = next_label
+                next_label += 1
+            else:
+                target = current
+            community_strength[target] += strength[node]
+            if target != current:
+                labels[node] = target
+                moved.append(node)
+        if not moved:
+            break
+        moved = np.array(moved)
+        starts, stops = indptr[moved], indptr[moved + 1]
+        pending = np.unique(np.concatenate([indices[start:stop] for start, stop in zip(starts, stops)]))
+    return _compact_labels(labels)
+
+# Betweenness estimate kept up to date under edge changes. For every source
+# it keeps the BFS depths; an added or removed edge (u, v) can only change a
+# source's dependencies when u and v are at different depths from it, so an
+# update reruns Brandes for just those sources and swaps their contribution.
+class BetweennessState:
+    def __init__(self, adjacency, sources, raw=None, depth=None, batch_size=BETWEENNESS_BATCH_SIZE):
+        self.sources = sources
+        self.batch_size = batch_size
+        if raw is None:
+            n = adjacency.shape[0]
+            raw, depth = np.zeros(n), np.empty((n, len(sources)), dtype=np.int32)
+            for start in range(0, len(sources), batch_size):
+                contribution, depth[:, start:start + batch_size] = _dependencies(adjacency, sources[start:start + batch_size])
+                raw += contribution
+        self.raw = raw
+        self.depth = depth
+
+    @property
+    def centrality(self):
+        return _rescale_betweenness(self.raw, len(self.raw), len(self.sources))
+
+    # State after the edges between u and v (arrays) changed from old_adjacency to adjacency
+    def updated(self, old_adjacency, adjacency, u, v):
+        affected = np.flatnonzero((self.depth[u] != self.depth[v]).any(axis=0))
+        # Swapping a contribution costs two runs; past half the sources one full run is cheaper
+        if 2 * len(affected) >= len(self.sources):
+            state = BetweennessState(adjacency, self.sources, batch_size=self.batch_size)
+            state.affected = len(self.sources)
+            return state
+        raw, depth = self.raw.copy(), self.depth.copy()
+        for start in range(0, len(affected), self.batch_size):
+            columns = affected[start:start + self.batch_size]
+            batch = self.sources[columns]
+            raw -= _dependencies(old_adjacency, batch)[0]
+            contribution, depth[:, columns] = _dependencies(adjacency, batch)
+            raw += contribution
+        state = BetweennessState(adjacency, self.sources, raw, depth, self.batch_size)
+        state.affected = len(affected)
+        return state
+
+# Communities, degree, betweenness and eigenvector centrality of one graph.
+# updated() carries them over to a changed edge set: communities by local
+# moves from the previous partition, centralities locally, and everything
+# from scratch (communities renumbered to match) once the edges changed since
+# the last full computation pass NETWORK_DRIFT_THRESHOLD of the graph.
+class NetworkState:
+    def __init__(self, adjacency, weights, labels, degree, betweenness, eigenvector, base_edges, changed=0, incremental=False):
+        self.adjacency = adjacency
+        self.weights = weights
+        self.labels = labels
+        self.degree = degree
+        self.betweenness = betweenness
+        self.eigenvector = eigenvector
+        self.base_edges = base_edges
+        self.changed = changed
+        self.incremental = incremental
+
+    @classmethod
+    def compute(cls, adjacency, weights, labels=None, previous_labels=None):
+        if labels is None:
+            labels = louvain_labels(weights)
+            if previous_labels is not None:
+                labels = align_labels(labels, previous_labels)
+        n = adjacency.shape[0]
+        k = BETWEENNESS_SAMPLES if n > BETWEENNESS_EXACT_MAX_NODES else None
+        return cls(
+            adjacency, weights, labels, np.diff(adjacency.indptr).astype(float),
+            BetweennessState(adjacency, betweenness_sources(n, k)), sparse_eigenvector_centrality(adjacency),
+            base_edges=adjacency.nnz // 2
+        )
+
+    def updated(self, adjacency, weights, labels=None, drift_threshold=NETWORK_DRIFT_THRESHOLD):
+        change = sp.triu(adjacency - self.adjacency, k=1).tocoo()
+        change.eliminate_zeros()
+        changed = self.changed + change.nnz
+        if changed > drift_threshold * max(self.base_edges, 1):
+            return NetworkState.compute(adjacency, weights, labels, previous_labels=self.labels)
+        reweighted = sp.triu(weights - self.weights, k=1).tocoo()
+        reweighted.eliminate_zeros()
+        if labels is None:
+            touched = np.concatenate([change.row, change.col, reweighted.row, reweighted.col])
+            labels = local_moves(weights, self.labels, touched) if len(touched) else self.labels
+        n = adjacency.shape[0]
+        degree = self.degree + np.bincount(change.row, weights=change.data, minlength=n) + np.bincount(change.col, weights=change.data, minlength=n)
+        betweenness = self.betweenness.updated(self.adjacency, adjacency, change.row, change.col) if change.nnz else self.betweenness
+        eigenvector = sparse_eigenvector_centrality(adjacency, start=self.eigenvector) if change.nnz else self.eigenvector
+        return NetworkState(adjacency, weights, labels, degree, betweenness, eigenvector, self.base_edges, changed, incremental=True)
+
+# Community labels per data version, one file each, so a restarted server
+# shows the same numbering
+class PartitionStore:
+    def __init__(self, directory=COMMUNITY_STORE_DIR):
+        self.directory = directory
+
+    def _path(self, version):
+        digest = hashlib.sha256(version.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, f"{digest}.joblib")
+
+    # Labels stored for version, if they were computed for these same nodes
+    def load(self, version, nodes):
+        try:
+            stored = joblib.load(self._path(version))
+        except Exception:
+            return None
+        if len(stored['nodes']) != len(nodes) or not np.array_equal(stored['nodes'], nodes):
+            return None
+        return stored['labels']
+
+    def save(self, version, nodes, labels):
+        path = self._path(version)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            joblib.dump({'version': version, 'nodes': nodes, 'labels': labels}, path + '.tmp')
+            os.replace(path + '.tmp', path)
+        except OSError:
+            pass
+
+partition_store = PartitionStore()
+
+def _node_element(name, attrs, x, y, community):
+    element = {'id': name, 'label': name, 'x': x, 'y': y, 'community': community}
+    if attrs['type'] == 'Official':
+        risk = attrs['risk_score']
+        element.update({
+            'shape': 'circle', 'size': 20,
+            'color': '#e74c3c' if risk > 0.6 else '#f39c12' if risk > 0.3 else '#3498db',
+            'title': f"Pejabat: {name}<br>Jabatan: {attrs['position']}<br>Kabupaten: {attrs['district']}<br>Skor Risiko: {risk:.2f}"
+        })
+    else:
+        element.update({
+            'shape': 'square', 'size': 25, 'color': '#2ecc71',
+            'title': f"Perusahaan: {name}<br>Komoditas: {attrs['commodity']}<br>Kabupaten: {attrs['district']}<br>Jenis Izin: {attrs['license_type']}"
+        })
+    return element
+
+def _edge_element(source, target, attrs):
+    return {'from': source, 'to': target, 'title': attrs['description'], 'width': attrs['weight'] * 5,
+            'color': '#e74c3c' if attrs['type'] == 'Official-Company' else '#95a5a6'}
+
+def _community_title(layout, community, officials):
+    return f"Komunitas {community + 1}<br>{layout.sizes[community]:,} node<br>{officials:,} pejabat"
+
+# vis-network nodes, edges and community super-nodes of an analysed graph at
+# its precomputed positions. Members of the expanded communities (all of them
+# when expanded is None) are sent as themselves; every other community as one
+# super-node, with its edges merged into one edge per neighbour.
+def network_elements(analysis, expanded=None):
+    G, layout = analysis.graph, analysis.layout()
+    labels, positions = layout.labels, layout.positions
+    n = len(analysis.nodes)
+    detailed = np.ones(n, dtype=bool) if expanded is None else np.isin(labels, list(expanded))
+    officials = np.bincount(labels[analysis.node_table['Type'].to_numpy() == 'Official'], minlength=len(layout.sizes))
+    nodes = [
+        _node_element(name, G.nodes[name], x, y, int(community))
+        for name, (x, y), community in zip(analysis.nodes[detailed], positions[detailed].tolist(), labels[detailed])
+    ]
+    names = analysis.nodes[detailed]
+    edges = [_edge_element(source, target, attrs) for source, target, attrs in G.subgraph(names).edges(data=True)]
+
+    collapsed = np.flatnonzero(~np.isin(np.arange(len(layout.sizes)), np.unique(labels[detailed])))
+    for community in collapsed.tolist():
+        x, y = layout.centers[community]
+        nodes.append({
+            'id': f"community:{community}", 'label': f"Komunitas {community + 1}", 'x': x, 'y': y,
+            'shape': 'dot', 'size': 15 + 5 * np.log2(layout.sizes[community]), 'color': '#8e44ad',
+            'title': _community_title(layout, community, officials[community])
+        })
+    if len(collapsed):
+        # Endpoints in collapsed communities stand for their super-node (n + label)
+        edge_list = sp.triu(analysis.adjacency, k=1).tocoo()
+        shown = np.where(detailed, np.arange(n), n + labels)
+        source, target = shown[edge_list.row], shown[edge_list.col]
+        merged = (source != target) & ~(detailed[edge_list.row] & detailed[edge_list.col])
+        pairs, counts = np.unique(np.sort(np.column_stack([source[merged], target[merged]]), axis=1), axis=0, return_counts=True)
+        ids = np.concatenate([analysis.nodes, np.array([f"community:{c}" for c in range(len(layout.sizes))], dtype=object)])
+        edges.extend(
+            {'from': ids[a], 'to': ids[b], 'title': f"{count:,} koneksi", 'width': 1 + np.log2(count), 'color': '#b39ddb'}
+            for (a, b), count in zip(pairs.tolist(), counts.tolist())
+        )
+    shown_communities = np.unique(labels[detailed])
+    communities = [
+        {'id': int(c), 'label': f"Komunitas {c + 1}", 'title': _community_title(layout, c, officials[c])}
+        for c in shown_communities[layout.sizes[shown_communities] > 1].tolist()
+    ]
+    return nodes, edges, communities
+
+# vis-network options: pyvis's settings with physics off, since the nodes
+# arrive at their precomputed positions
+def network_options():
+    from pyvis.network import Network
+    net = Network()
+    net.toggle_physics(False)
+    options = json.loads(net.options.to_json())
+    options['edges']['smooth'] = False
+    return options
+
+# Asset loader of the network page (loadAssets): the vendored files from
+# Streamlit's static serving, or the pinned CDN builds when asked for
+def network_assets():
+    if NETWORK_ASSETS == 'cdn':
+        return NETWORK_CDN_ASSETS
+    return NETWORK_STATIC_ASSETS.substitute(
+        files=json.dumps([f"{NETWORK_STATIC_URL}/{name}" for name in NETWORK_STATIC_FILES])
+    )
+
+# Self-contained vis-network page, built as a string (nothing is written to disk)
+def render_network_html(nodes, edges, communities=(), height=NETWORK_HEIGHT):
+    return NETWORK_TEMPLATE.substitute(
+        assets=network_assets(), height=height,
+        nodes=_script_json(nodes), edges=_script_json(edges), options=_script_json(network_options()),
+        communities=_script_json(list(communities)), cluster_scale=NETWORK_CLUSTER_SCALE
+    )
+
+# Rendered once per graph version and set of expanded communities, and shared
+# (read-only) by every session
+@st.cache_resource(show_spinner=False, max_entries=16)
+def network_html(version, _analysis, expanded=None, height=NETWORK_HEIGHT):
+    return render_network_html(*network_elements(_analysis, expanded), height=height)
+
+# Community labels, node positions (in pixels) and per-community sizes and
+# centres of a graph; computed once per graph version
+class NetworkLayout:
+    def __init__(self, adjacency, labels):
+        self.labels = labels
+        self.sizes = np.bincount(labels) if len(labels) else np.zeros(0, dtype=np.int64)
+        self.positions = multilevel_layout(adjacency, labels)
+        self.centers = np.column_stack([
+            np.bincount(labels, weights=self.positions[:, axis], minlength=len(self.sizes)) for axis in (0, 1)
+        ]) / np.maximum(self.sizes, 1)[:, None]
+
+# The network page's graph with its communities, layout, centralities and
+# metrics. The expensive part runs once, in a background thread started on
+# construction; layout() waits for the first two, result() for all of it.
+# With the analysis of the previous data version (same nodes), communities
+# and centralities are updated from it instead of computed from scratch; with
+# a version, the communities are persisted for it.
+class NetworkAnalysis:
+    def __init__(self, G, officials, version=None, previous=None):
+        self.graph = G
+        self.version = version
+        self.nodes = np.array(list(G.nodes), dtype=object)
+        self.node_table = node_table(self.nodes, officials)
+        self.adjacency = nx.to_scipy_sparse_array(G, nodelist=self.nodes, weight=None, format='csr').astype(float)
+        self.weights = nx.to_scipy_sparse_array(G, nodelist=self.nodes, weight='weight', format='csr').astype(float)
+        self.state = None
+        self._previous = previous
+        self.centrality = None
+        self.metrics = None
+        self._layout = None
+        self.error = None
+        self._laid_out = threading.Event()
+        self._done = threading.Event()
+        threading.Thread(target=self._compute, name='network-analysis', daemon=True).start()
+
+    def _compute(self):
+        try:
+            try:
+                self.state = self._network_state()
+                self._layout = NetworkLayout(self.adjacency, self.state.labels)
+            except Exception as error:
+                # Recorded before the event, so a waiting layout() always finds it
+                self.error = error
+                raise
+            finally:
+                self._laid_out.set()
+            n = len(self.nodes)
+            self.centrality = self.node_table.assign(**{
+                'Degree Centrality': self.state.degree / max(n - 1, 1),
+                'Betweenness Centrality': self.state.betweenness.centrality,
+                'Eigenvector Centrality': self.state.eigenvector
+            })
+            self.metrics = {
+                'nodes': n,
+                'edges': self.graph.number_of_edges(),
+                'density': nx.density(self.graph),
+                'average_clustering': average_clustering(self.graph, self.adjacency)
+            }
+        except Exception as error:
+            self.error = error
+        finally:
+            self._done.set()
+
+    def _network_state(self):
+        previous, self._previous = self._previous, None
+        stored = partition_store.load(self.version, self.nodes) if self.version is not None else None
+        if previous is not None:
+            previous._done.wait()
+            if previous.state is None or not np.array_equal(previous.nodes, self.nodes):
+                previous = None
+        if previous is not None:
+            state = previous.state.updated(self.adjacency, self.weights, labels=stored)
+        else:
+            state = NetworkState.compute(self.adjacency, self.weights, labels=stored)
+        if stored is None and self.version is not None:
+            partition_store.save(self.version, self.nodes, state.labels)
+        return state
+
+    def layout(self, timeout=None):
+        if not self._laid_out.wait(timeout):
+            raise TimeoutError("Network layout is still running")
+        if self._layout is None:
+            raise self.error
+        return self._layout
+
+    # Members of each community, the largest first (see community_table)
+    def communities(self):
+        layout = self.layout()
+        members = self.nodes[np.argsort(layout.labels, kind='stable')]
+        return np.split(members, np.cumsum(layout.sizes)[:-1])
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError("Network analysis is still running")
+        if self.error is not None:
+            raise self.error
+        return self.centrality, self.metrics
+
+# The most recent analysis, the starting point of the next data version's
+_latest_analysis = {}
+_latest_analysis_lock = threading.Lock()
+
+# Built (and its analysis started) once per data version, shared by every session
+@st.cache_resource(show_spinner=False, max_entries=2)
+def network_analysis(version, _officials, _mining_data, _connections):
+    with _latest_analysis_lock:
+        previous = _latest_analysis.get('network')
+    analysis = NetworkAnalysis(build_graph(_officials, _mining_data, _connections), _officials, version, previous)
+    with _latest_analysis_lock:
+        _latest_analysis['network'] = analysis
+    return analysis
+
+# Nodes (positions into GraphIndex.nodes) and edges (rows of its edge arrays)
+# returned by a query. hops is each node's distance from the query node; path
+# is the node sequence of a shortest path.
+class GraphQueryResult:
+    def __init__(self, index, positions, edges, hops=None, path=None, truncated=False):
+        self.index = index
+        self.positions = positions
+        self.edges = edges
+        self.hops = hops
+        self.path = path
+        self.truncated = truncated
+
+    @property
+    def names(self):
+        return self.index.nodes[self.positions]
+
+    def __len__(self):
+        return len(self.positions)
+
+# CSR adjacency of the connections, each entry pointing at its edge's weight,
+# type and description, for neighbourhood and shortest-path queries limited
+# to some edge types and a minimum weight. A query only reads the edges of
+# the nodes it reaches, so its cost does not grow with the whole graph.
+class GraphIndex:
+    def __init__(self, nodes, connections):
+        self.nodes = np.asarray(nodes, dtype=object)
+        self.lookup = pd.Index(self.nodes)
+        n = len(self.nodes)
+        source = self.lookup.get_indexer(connections['source'])
+        target = self.lookup.get_indexer(connections['target'])
+        low, high = np.minimum(source, target), np.maximum(source, target)
+        # A repeated pair keeps its last row, as in the networkx graph
+        key = low.astype(np.int64) * n + high
+        _, last = np.unique(key[::-1], return_index=True)
+        rows = np.sort(len(key) - 1 - last)
+        rows = rows[(low[rows] >= 0) & (low[rows] != high[rows])]
+        self.edge_source = low[rows]
+        self.edge_target = high[rows]
+        self.edge_weight = connections['weight'].to_numpy(dtype=float)[rows]
+        self.types = pd.Index(EDGE_TYPES).append(pd.Index(connections['type'].unique()).difference(EDGE_TYPES))
+        self.edge_type = self.types.get_indexer(connections['type'].to_numpy()[rows]).astype(np.int8)
+        self.edge_description = connections['description'].to_numpy(dtype=object)[rows]
+
+        heads = np.concatenate([self.edge_source, self.edge_target])
+        tails = np.concatenate([self.edge_target, self.edge_source])
+        order = np.lexsort((tails, heads))
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(heads, minlength=n))])
+        self.indices = tails[order]
+        self.edge_of = np.tile(np.arange(len(rows)), 2)[order]
+
+        # Lower-cased names, and the same sorted for prefix searches
+        self.search_names = self.lookup.astype(str).str.lower()
+        self.name_order = np.argsort(self.search_names.to_numpy(dtype=object), kind='stable')
+        self.sorted_names = self.search_names.to_numpy(dtype=object)[self.name_order]
+        self._searches = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _position(self, node):
+        position = self.lookup.get_loc(node)
+        if not isinstance(position, (int, np.integer)):
+            raise ValueError(f"Node is not unique: {node}")
+        return position
+
+    # Up to limit node names containing text (case-insensitive): names starting
+    # with it first, by binary search, then other matches from one scan
+    def search(self, text, limit=NODE_SEARCH_LIMIT):
+        text = text.strip().lower()
+        if not text:
+            return self.nodes[:limit].tolist()
+        key = (text, limit)
+        found = self._searches.get(key)
+        if found is None:
+            lo = np.searchsorted(self.sorted_names, text, 'left')
+            hi = np.searchsorted(self.sorted_names, text + '\uffff', 'left')
+            positions = self.name_order[lo:min(hi, lo + limit)]
+            if len(positions) < limit:
+                matches = np.flatnonzero(self.search_names.str.contains(text, regex=False))
+                others = matches[~np.isin(matches, positions)]
+                positions = np.concatenate([positions, others[:limit - len(positions)]])
+            found = self.nodes[positions].tolist()
+            if len(self._searches) >= NODE_SEARCH_CACHE_SIZE:
+                self._searches.clear()
+            self._searches[key] = found
+        return found
+
+    def _type_table(self, edge_types):
+        if edge_types is None:
+            return np.ones(len(self.types), dtype=bool)
+        return np.isin(self.types, list(edge_types))
+
+    # (from, to, edge) of the allowed edges leaving the frontier
+    def _expand(self, frontier, type_table, min_weight):
+        starts = self.indptr[frontier]
+        counts = self.indptr[frontier + 1] - starts
+        entries = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        edges = self.edge_of[entries]
+        keep = type_table[self.edge_type[edges]] & (self.edge_weight[edges] >= min_weight)
+        return np.repeat(frontier, counts)[keep], self.indices[entries][keep], edges[keep]
+
+    # Allowed edges between the given nodes
+    def _induced_edges(self, positions, type_table, min_weight):
+        inside = np.zeros(len(self.nodes), dtype=bool)
+        inside[positions] = True
+        _, tails, edges = self._expand(positions, type_table, min_weight)
+        return np.unique(edges[inside[tails]])
+
+    # Nodes within hops of node over the allowed edges (its ego network for
+    # hops=1), in BFS order, with the allowed edges between them
+    def k_hop(self, node, hops=1, edge_types=None, min_weight=0.0, limit=QUERY_MAX_NODES):
+        type_table = self._type_table(edge_types)
+        depth = np.full(len(self.nodes), -1, dtype=np.int32)
+        frontier = np.array([self._position(node)])
+        depth[frontier] = 0
+        levels = [frontier]
+        size, truncated = 1, False
+        for level in range(1, hops + 1):
+            _, tails, _ = self._expand(frontier, type_table, min_weight)
+            frontier = np.unique(tails[depth[tails] < 0])
+            if size + len(frontier) > limit:
+                frontier, truncated = frontier[:limit - size], True
+            if not len(frontier):
+                break
+            depth[frontier] = level
+            levels.append(frontier)
+            size += len(frontier)
+            if truncated:
+                break
+        positions = np.concatenate(levels)
+        return GraphQueryResult(
+            self, positions, self._induced_edges(positions, type_table, min_weight), hops=depth[positions], truncated=truncated
+        )
+
+    # A shortest path (fewest edges) from source to target over the allowed
+    # edges, by BFS from both ends, always growing the smaller frontier by a
+    # whole level. None when they are not connected.
+    def shortest_path(self, source, target, edge_types=None, min_weight=0.0):
+        type_table = self._type_table(edge_types)
+        ends = [self._position(source), self._position(target)]
+        n = len(self.nodes)
+        depth = np.full((2, n), -1, dtype=np.int32)
+        parent = np.full((2, n), -1, dtype=np.int64)
+        via = np.full((2, n), -1, dtype=np.int64)
+        depth[0, ends[0]] = depth[1, ends[1]] = 0
+        frontiers = [np.array([ends[0]]), np.array([ends[1]])]
+        meet = ends[0] if ends[0] == ends[1] else None
+        while meet is None and len(frontiers[0]) and len(frontiers[1]):
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            heads, tails, edges = self._expand(frontiers[side], type_table, min_weight)
+            new = depth[side, tails] < 0
+            tails, first = np.unique(tails[new], return_index=True)
+            depth[side, tails] = depth[side, frontiers[side][0]] + 1
+            parent[side, tails] = heads[new][first]
+            via[side, tails] = edges[new][first]
+            met = tails[depth[1 - side, tails] >= 0]
+            if len(met):
+                meet = met[np.argmin(depth[1 - side, met])]
+            frontiers[side] = tails
+        if meet is None:
+            return None
+        halves = []
+        for side in (0, 1):
+            nodes, edges, current = [], [], meet
+            while current != ends[side]:
+                edges.append(via[side, current])
+                current = parent[side, current]
+                nodes.append(current)
+            halves.append((nodes, edges))
+        path = np.array(halves[0][0][::-1] + [meet] + halves[1][0], dtype=np.int64)
+        edges = np.array(halves[0][1][::-1] + halves[1][1], dtype=np.int64)
+        return GraphQueryResult(self, path, edges, hops=np.arange(len(path)), path=path)
+
+# The (version's) query index of the network page, shared by every session
+@st.cache_resource(show_spinner=False, max_entries=2)
+def graph_index(version, _nodes, _connections):
+    return GraphIndex(_nodes, _connections)
+
+# vis-network nodes and edges of a query result, laid out on their own; the
+# query's end nodes are outlined
+def query_elements(analysis, result):
+    index = result.index
+    local = sp.csr_array(
+        (np.ones(len(result.edges)), (
+            pd.Index(result.positions).get_indexer(index.edge_source[result.edges]),
+            pd.Index(result.positions).get_indexer(index.edge_target[result.edges])
+        )), shape=(len(result), len(result))
+    )
+    positions = nx.rescale_layout(_local_layout(local, GRAPH_SEED), scale=np.sqrt(len(result))) * LAYOUT_SPACING
+    ends = {result.positions[0], result.positions[-1]} if result.path is not None else {result.positions[0]}
+    nodes = []
+    for position, name, (x, y) in zip(result.positions.tolist(), result.names, positions.tolist()):
+        element = _node_element(name, analysis.graph.nodes[name], x, y, None)
+        if position in ends:
+            element.update({'borderWidth': 4, 'color': {'background': element['color'], 'border': '#2c3e50'}})
+        nodes.append(element)
+    edges = [
+        _edge_element(index.nodes[source], index.nodes[target], {'description': description, 'weight': weight, 'type': index.types[edge_type]})
+        for source, target, weight, edge_type, description in zip(
+            index.edge_source[result.edges], index.edge_target[result.edges], index.edge_weight[result.edges],
+            index.edge_type[result.edges], index.edge_description[result.edges]
+        )
+    ]
+    return nodes, edges
+
+# Result and rendered page of a query, cached per data version and
+# parameters: kind 'k_hop' (argument = hops) or 'path' (argument = target)
+@st.cache_resource(show_spinner=False, max_entries=32)
+def query_view(version, _analysis, _index, kind, node, argument, edge_types, min_weight, height=NETWORK_HEIGHT):
+    if kind == 'k_hop':
+        result = _index.k_hop(node, argument, edge_types, min_weight)
+    else:
+        result = _index.shortest_path(node, argument, edge_types, min_weight)
+    if result is None:
+        return None, None
+    return result, render_network_html(*query_elements(_analysis, result), height=height)
@@ -0,0 +1,259 @@
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data import TRANSACTION_COLUMNS, TRANSACTION_TYPES, transaction_flag, transaction_ml_score
+from explorer import TransactionCube
+from features import FeatureState
+
+# Columnar store of ingested transactions: one Parquet part per micro-batch,
+# numbered in arrival order. A single ingestion process writes it; any number
+# of dashboard processes read the parts they have not seen yet.
+TRANSACTION_STORE_DIR = os.environ.get(
+    'TRANSACTION_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'transactions')
+)
+INGEST_BATCH_SIZE = 50_000
+# Longest a queued transaction waits before its (partial) micro-batch is written
+INGEST_FLUSH_SECONDS = 2.0
+
+# Columns a source has to provide; the official's name, position, district and
+# mine come from the officials table, the pattern features and score are computed
+INPUT_COLUMNS = ['date', 'official_id', 'amount', 'transaction_type', 'counterparty']
+RECENT_SUSPICIOUS_ROWS = 50
+
+# Coerces a raw batch to the input schema. Returns (valid, rejected), the
+# rejected rows carrying a 'reason' column.
+def validate_transactions(batch, officials):
+    missing = [column for column in INPUT_COLUMNS if column not in batch.columns]
+    if missing:
+        raise ValueError(f"Transaction batch is missing columns: {', '.join(missing)}")
+    batch = batch[INPUT_COLUMNS].reset_index(drop=True)
+    coerced = pd.DataFrame({
+        'date': pd.to_datetime(batch['date'], errors='coerce').dt.tz_localize(None),
+        'official_id': pd.to_numeric(batch['official_id'], errors='coerce'),
+        'amount': pd.to_numeric(batch['amount'], errors='coerce'),
+        'transaction_type': batch['transaction_type'].astype(object),
+        'counterparty': batch['counterparty'].astype(object)
+    })
+    reason = np.full(len(coerced), None, dtype=object)
+    checks = [
+        ('tanggal tidak valid', coerced['date'].isna()),
+        ('pejabat tidak dikenal', ~coerced['official_id'].isin(officials['id'])),
+        ('nilai tidak valid', ~(coerced['amount'] > 0)),
+        # amount is stored as int64; a fraction would otherwise be cut off silently
+        ('nilai bukan bilangan bulat', coerced['amount'] % 1 != 0),
+        ('jenis transaksi tidak dikenal', ~coerced['transaction_type'].isin(TRANSACTION_TYPES)),
+        ('pihak terkait kosong', coerced['counterparty'].isna())
+    ]
+    # The first failing check is the one reported
+    for label, failed in reversed(checks):
+        reason[failed.to_numpy()] = label
+    rejected = reason != None
+    valid = coerced[~rejected].astype({'official_id': officials['id'].dtype, 'amount': 'int64'})
+    return valid, batch[rejected].assign(reason=reason[rejected])
+
+# Full transaction rows (TRANSACTION_COLUMNS) for a validated micro-batch and
+# its (frequency, structuring, unusual) pattern features. With a scorer (a
+# models.TransactionScorer) the flag comes from the trained classifier,
+# otherwise from the ml_score threshold.
+def score_transactions(batch, officials, features, scorer=None):
+    profile = officials.set_index('id').loc[batch['official_id'], ['name', 'position', 'district', 'risk_score', 'connected_mine_id']]
+    frequency, structuring, unusual = features
+    official_risk = profile['risk_score'].to_numpy()
+    ml_score = transaction_ml_score(frequency, structuring, unusual, official_risk)
+    if scorer is not None:
+        flag = scorer.flag(np.column_stack([frequency, structuring, unusual, official_risk]))
+    else:
+        flag = transaction_flag(ml_score)
+    return pd.DataFrame({
+        'date': batch['date'].to_numpy(),
+        'official_id': batch['official_id'].to_numpy(),
+        'official_name': profile['name'].to_numpy(),
+        'position': profile['position'].to_numpy(),
+        'district': profile['district'].to_numpy(),
+        'amount': batch['amount'].to_numpy(),
+        'transaction_type': batch['transaction_type'].to_numpy(),
+        'counterparty': batch['counterparty'].to_numpy(),
+        'frequency_pattern': frequency,
+        'structuring_pattern': structuring,
+        'unusual_pattern': unusual,
+        'ml_score': ml_score,
+        'flag': flag,
+        'connected_mine_id': profile['connected_mine_id'].to_numpy()
+    })[TRANSACTION_COLUMNS]
+
+# Micro-batches from a CSV, Parquet or JSON-lines file
+def read_batches(path, batch_size=INGEST_BATCH_SIZE):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        yield from pd.read_csv(path, chunksize=batch_size)
+    elif extension in ('.parquet', '.pq'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+    elif extension in ('.jsonl', '.ndjson'):
+        yield from pd.read_json(path, lines=True, chunksize=batch_size)
+    else:
+        raise ValueError(f"Unsupported transaction file: {path}")
+
+class TransactionStore:
+    PART_PATTERN = re.compile(r'part-(\d{8})\.parquet$')
+
+    def __init__(self, directory=TRANSACTION_STORE_DIR):
+        self.directory = directory
+
+    def parts(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(int(match.group(1)) for match in map(self.PART_PATTERN.match, names) if match)
+
+    def _write(self, name, frame):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        frame.to_parquet(path + '.tmp', index=False)
+        os.replace(path + '.tmp', path)
+
+    def append(self, transactions):
+        parts = self.parts()
+        sequence = parts[-1] + 1 if parts else 1
+        self._write(f"part-{sequence:08d}.parquet", transactions)
+        return sequence
+
+    def append_rejected(self, rejected):
+        self._write(f"rejected-{time.time_ns()}.parquet", rejected.astype(str))
+
+    # Rows of the parts after `after`, and the last part number read
+    def read_since(self, after=0):
+        parts = [part for part in self.parts() if part > after]
+        if not parts:
+            return None, after
+        frames = [pd.read_parquet(os.path.join(self.directory, f"part-{part:08d}.parquet")) for part in parts]
+        return pd.concat(frames, ignore_index=True), parts[-1]
+
+    def clear(self):
+        for part in self.parts():
+            os.remove(os.path.join(self.directory, f"part-{part:08d}.parquet"))
+
+# Validates, scores and stores micro-batches from files or a queue. The
+# pattern features continue from history (the loaded transactions) and the
+# rows already in the store.
+class TransactionIngestor:
+    def __init__(self, officials, store=None, history=None, scorer=None):
+        self.officials = officials
+        self.scorer = scorer
+        self.store = store or TransactionStore()
+        stored, _ = self.store.read_since(0)
+        known = [frame for frame in (history, stored) if frame is not None]
+        self.features = FeatureState.from_transactions(pd.concat(known)) if known else FeatureState()
+        self.ingested = 0
+        self.rejected = 0
+
+    def ingest_batch(self, batch):
+        valid, rejected = validate_transactions(batch, self.officials)
+        if len(rejected):
+            self.rejected += len(rejected)
+            self.store.append_rejected(rejected)
+        if len(valid):
+            self.store.append(score_transactions(valid, self.officials, self.features.update(valid), self.scorer))
+            self.ingested += len(valid)
+        return len(valid), len(rejected)
+
+    def ingest_file(self, path, batch_size=INGEST_BATCH_SIZE):
+        for batch in read_batches(path, batch_size):
+            self.ingest_batch(batch)
+
+    # Consumes transactions (dicts or DataFrames) from q until stop is set,
+    # writing a micro-batch every batch_size rows or flush_seconds
+    def ingest_queue(self, q, stop, batch_size=INGEST_BATCH_SIZE, flush_seconds=INGEST_FLUSH_SECONDS):
+        pending, deadline = [], None
+        while not (stop.is_set() and not pending and q.empty()):
+            try:
+                item = q.get(timeout=0.1)
+                pending.append(item if isinstance(item, pd.DataFrame) else pd.DataFrame([item]))
+                deadline = deadline or time.monotonic() + flush_seconds
+            except queue.Empty:
+                pass
+            if pending and (sum(map(len, pending)) >= batch_size or time.monotonic() >= deadline or stop.is_set()):
+                self.ingest_batch(pd.concat(pending, ignore_index=True))
+                pending, deadline = [], None
+
+    def start_queue(self, q, **kwargs):
+        stop = threading.Event()
+        threading.Thread(target=self.ingest_queue, args=(q, stop), kwargs=kwargs, name='ingest', daemon=True).start()
+        return stop
+
+# Transactions of the dashboard: the loaded data plus everything ingested
+# into the store so far, with the aggregate cube and the most recent
+# suspicious rows kept up to date batch by batch. With a scorer (and the
+# officials, for their risk scores) every row is flagged by the trained
+# classifier, loaded rows and streamed ones alike.
+class LiveTransactions:
+    def __init__(self, transactions, store=None, officials=None, scorer=None):
+        self.store = store or TransactionStore()
+        self.officials = officials
+        self.scorer = scorer
+        transactions = self._flagged(transactions)
+        self.frame = transactions
+        self.cube = TransactionCube(transactions)
+        self.recent_suspicious = self._recent(transactions)
+        self.streamed = 0
+        self.last_part = 0
+        self._lock = threading.Lock()
+
+    def _flagged(self, transactions):
+        if self.scorer is None:
+            return transactions
+        official_risk = self.officials.set_index('id')['risk_score'].reindex(transactions['official_id']).to_numpy()
+        return transactions.assign(flag=self.scorer.flag(np.column_stack([
+            transactions['frequency_pattern'].to_numpy(), transactions['structuring_pattern'].to_numpy(),
+            transactions['unusual_pattern'].to_numpy(), official_risk
+        ])))
+
+    @staticmethod
+    def _recent(transactions):
+        return transactions[transactions['flag'] == 'Suspicious'].nlargest(RECENT_SUSPICIOUS_ROWS, 'date')
+
+    # Picks up parts written since the last call; cheap when there are none
+    def refresh(self):
+        with self._lock:
+            new, last_part = self.store.read_since(self.last_part)
+            if new is not None:
+                new = self._flagged(new)
+                self.frame = pd.concat([self.frame, new], ignore_index=True)
+                self.cube.append(new)
+                self.recent_suspicious = self._recent(pd.concat([self.recent_suspicious, new]))
+                self.streamed += len(new)
+                self.last_part = last_part
+        return self
+
+    # Changes with every batch picked up; keys caches built from frame
+    @property
+    def version(self):
+        return f"{self.last_part}:{len(self.frame)}"
+
+# version covers the data and the scorer's model revision
+@st.cache_resource(show_spinner=False)
+def live_transactions(version, _transactions, _officials=None, _scorer=None):
+    return LiveTransactions(_transactions, officials=_officials, scorer=_scorer)
+
+# python ingest.py file [file ...]
+if __name__ == '__main__':
+    if not sys.argv[1:]:
+        sys.exit("usage: python ingest.py transactions.(csv|parquet|jsonl) [...]")
+    from data import get_data, data_version
+    from models import get_model, transaction_training_frame
+    _, _, officials, transactions, _, _, _ = get_data()
+    scorer, _ = get_model('transaction_scorer', data_version(), transaction_training_frame(transactions, officials))
+    ingestor = TransactionIngestor(officials, history=transactions, scorer=scorer)
+    for path in sys.argv[1:]:
+        ingestor.ingest_file(path)
+        print(f"{path}: {ingestor.ingested:,} rows ingested, {ingestor.rejected:,} rejected so far")
@@ -0,0 +1,279 @@
+from urllib.parse import quote
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import folium
+import geopandas as gpd
+import streamlit as st
+import streamlit.components.v1 as components
+from branca.element import MacroElement, Template
+from folium.plugins import FastMarkerCluster
+
+from geo import viewport_geojson
+from tile_server import layer_url, register_layer, start_tile_server
+
+RISK_COLORS = {'Tinggi': 'red', 'Sedang': 'orange', 'Rendah': 'green'}
+
+# Above this many mines the maps default to fetching features per viewport
+VIEWPORT_MODE_THRESHOLD = 500
+# Above this many mines the risk map clusters its markers
+CLUSTER_THRESHOLD = 200
+
+# Rendered map HTML cache: in-memory LRU capped by size, backed by a disk tier
+# that survives worker restarts (set MAP_HTML_CACHE_DIR to '' to disable it)
+MAP_HTML_CACHE_MAX_BYTES = 64 * 2**20
+MAP_HTML_CACHE_DISK_MAX_BYTES = 256 * 2**20
+# Bumped whenever the maps render differently for the same data
+MAP_HTML_FORMAT = 2
+MAP_HTML_CACHE_DIR = os.environ.get(
+    'MAP_HTML_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'maps')
+)
+
+# Popup of the risk map; {field} placeholders are filled in the browser from
+# the feature properties built by risk_points()
+RISK_POPUP_TEMPLATE = """
+<div style="width: 300px; font-family: Arial;">
+    <h4 style="color: #333;">{name} ({commodity})</h4>
+    <p><b>Kabupaten:</b> {district}</p>
+    <p><b>Perusahaan:</b> {company}</p>
+    <p><b>Izin:</b> {license_type}</p>
+    <p><b>Konsesi:</b> {concession_match}</p>
+    <p><b>Luas Konsesi:</b> {concession_area}</p>
+    <p><b>Perubahan Lahan:</b> {percent_change}%</p>
+    <p><b>Skor Risiko:</b> {integrated_risk_score} ({risk_category})</p>
+    <hr>
+    <p><b>Risiko Perubahan Lahan:</b> {land_change_risk}</p>
+    <p><b>Risiko Keuangan:</b> {financial_risk}</p>
+    <p><b>Risiko Pejabat:</b> {official_risk}</p>
+    <p><b>Risiko Transaksi:</b> {transaction_risk}</p>
+</div>
+"""
+
+# Concession areas for display; mines without a concession show '-'
+def format_concession_area(area):
+    return area.map(lambda value: '-' if value != value else f"{value:.2f} km²")
+
+# One point per mine with the popup fields already formatted
+def risk_points(integrated_risk, mining_data, land_change, footprints):
+    mines = mining_data.set_index('id')
+    points = integrated_risk.join(
+        mines[['name', 'commodity', 'company', 'license_type', 'lat', 'lon']], on='mine_id'
+    ).join(land_change.set_index('mine_id')['percent_change'], on='mine_id').join(
+        footprints.set_index('mine_id')[['concession_area', 'concession_match']], on='mine_id'
+    )
+    properties = {
+        'name': points['name'],
+        'commodity': points['commodity'],
+        'district': points['district'],
+        'company': points['company'],
+        'license_type': points['license_type'],
+        'concession_area': format_concession_area(points['concession_area']),
+        'concession_match': points['concession_match'].fillna('-').astype(str),
+        'percent_change': points['percent_change'].map('{:.1f}'.format),
+        'integrated_risk_score': points['integrated_risk_score'].map('{:.2f}'.format),
+        'risk_category': points['risk_category'].astype(str),
+        'color': points['risk_category'].map(RISK_COLORS).astype(str)
+    }
+    for factor in ['land_change_risk', 'financial_risk', 'official_risk', 'transaction_risk']:
+        properties[factor] = points[factor].map('{:.2f}'.format)
+    return gpd.GeoDataFrame(properties, geometry=gpd.points_from_xy(points['lon'], points['lat']), crs='EPSG:4326')
+
+# The pre-joined point frame only changes with the data version
+@st.cache_resource(show_spinner=False)
+def cached_risk_points(version, _integrated_risk, _mining_data, _land_change, _footprints):
+    return risk_points(_integrated_risk, _mining_data, _land_change, _footprints)
+
+# All mines as one JSON array of [lat, lon, *popup fields] rows; a single JS
+# callback builds each marker and fills RISK_POPUP_TEMPLATE only when a popup
+# is opened. Markers are clustered by Leaflet.markercluster when cluster is
+# True, otherwise every marker is shown with its name label.
+def add_risk_markers(m, points, cluster=None):
+    if cluster is None:
+        cluster = len(points) > CLUSTER_THRESHOLD
+    fields = ['color'] + [column for column in points.columns if column not in ('color', points.geometry.name)]
+    rows = [
+        [lat, lon, *values]
+        for lat, lon, *values in zip(points.geometry.y, points.geometry.x, *(points[field] for field in fields))
+    ]
+    callback = rf"""(function () {{
+        var fields = {json.dumps(fields)};
+        var template = {json.dumps(RISK_POPUP_TEMPLATE)};
+        return function (row) {{
+            var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {{
+                radius: 15, color: row[2], fillColor: row[2], fillOpacity: 0.7
+            }});
+            marker.bindPopup(function () {{
+                return template.replace(/\{{(\w+)\}}/g, function (match, key) {{ return row[fields.indexOf(key) + 2]; }});
+            }}, {{maxWidth: 350}});
+            marker.bindTooltip(row[fields.indexOf('name') + 2], {{permanent: {json.dumps(not cluster)}, direction: 'bottom'}});
+            return marker;
+        }};
+    }})()"""
+    options = {} if cluster else {'disableClusteringAtZoom': 0}
+    FastMarkerCluster(rows, callback=callback, name="Tambang", **options).add_to(m)
+
+# Registers a viewport layer on the local tile server once per (name, version)
+# and returns the URL the map fetches it from
+@st.cache_resource(show_spinner=False)
+def serve_viewport_layer(name, version, _build_features):
+    features = _build_features()
+    path = f"{name}/{quote(version, safe='')}"
+    register_layer(path, lambda bbox, zoom: viewport_geojson(features, bbox))
+    return layer_url(start_tile_server(), path)
+
+@st.cache_resource(show_spinner=False)
+def serve_provider_layer(name, version, _build_provider):
+    path = f"{name}/{quote(version, safe='')}"
+    register_layer(path, _build_provider())
+    return layer_url(start_tile_server(), path)
+
+# Leaflet layer that refetches its features from a viewport endpoint on every
+# pan/zoom, so only what is visible ever reaches the browser
+class ViewportGeoJson(MacroElement):
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var map = {{ this._parent.get_name() }};
+            var popupTemplate = {{ this.popup_template|tojson }};
+            var layer = L.geoJSON(null, {
+                style: function(feature) { return {{ this.style|tojson }}; },
+                pointToLayer: function(feature, latlng) {
+                    var color = feature.properties.color || '#3388ff';
+                    return L.circleMarker(latlng, {radius: {{ this.radius }}, color: color, fillColor: color, fillOpacity: 0.7});
+                },
+                onEachFeature: function(feature, featureLayer) {
+                    var p = feature.properties;
+                    if (popupTemplate) {
+                        featureLayer.bindPopup(popupTemplate.replace(/\\{(\\w+)\\}/g, function(m, key) { return p[key]; }), {maxWidth: 350});
+                    }
+                    {% if this.tooltip_field %}
+                    featureLayer.bindTooltip(String(p[{{ this.tooltip_field|tojson }}]));
+                    {% endif %}
+                }
+            }).addTo(map);
+            var pending = null;
+            function refresh() {
+                var b = map.getBounds();
+                var url = {{ this.url|tojson }} + '?bbox=' + [b.getWest(), b.getSouth(), b.getEast(), b.getNorth()].join(',') + '&zoom=' + map.getZoom();
+                if (pending) { pending.abort(); }
+                pending = new AbortController();
+                fetch(url, {signal: pending.signal})
+                    .then(function(response) { return response.json(); })
+                    .then(function(data) { layer.clearLayers(); layer.addData(data); })
+                    .catch(function() {});
+            }
+            map.on('moveend', refresh);
+            refresh();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, url, popup_template=None, tooltip_field=None, style=None, radius=15):
+        super().__init__()
+        self._name = 'ViewportGeoJson'
+        self.url = url
+        self.popup_template = popup_template
+        self.tooltip_field = tooltip_field
+        self.style = style or {'color': '#34495e', 'weight': 1, 'fillOpacity': 0.2}
+        self.radius = radius
+
+class MapHtmlCache:
+    def __init__(self, max_bytes=MAP_HTML_CACHE_MAX_BYTES, disk_dir=MAP_HTML_CACHE_DIR,
+                 disk_max_bytes=MAP_HTML_CACHE_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir or None
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, hashlib.sha256(repr(key).encode('utf-8')).hexdigest() + '.html')
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), encoding='utf-8') as f:
+                    html = f.read()
+            except OSError:
+                return None
+            self._remember(key, html)
+            return html
+        return None
+
+    def put(self, key, html):
+        self._remember(key, html)
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                path = self._disk_path(key)
+                with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                    f.write(html)
+                os.replace(path + '.tmp', path)
+                self._prune_disk()
+            except OSError:
+                pass
+
+    def _remember(self, key, html):
+        size = len(html)
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            if size > self.max_bytes:
+                return
+            self._entries[key] = html
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    # Drops the least recently written files once the disk tier is over its cap
+    def _prune_disk(self):
+        files = [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir) if name.endswith('.html')]
+        stats = sorted((os.stat(path).st_mtime, os.stat(path).st_size, path) for path in files)
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in stats:
+            if total <= self.disk_max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for name in os.listdir(self.disk_dir):
+                if name.endswith('.html'):
+                    os.remove(os.path.join(self.disk_dir, name))
+
+    def get_or_render(self, key, render):
+        html = self.get(key)
+        if html is None:
+            html = render()
+            self.put(key, html)
+        return html
+
+map_html_cache = MapHtmlCache()
+
+def render_map_html(m):
+    return folium.Figure().add_child(m).render()
+
+# Map HTML keyed on (page, year, data version, variant); build() returning the
+# folium.Map only runs on a miss. variant covers anything else baked into the
+# HTML, such as viewport endpoint URLs, and MAP_HTML_FORMAT changes to the
+# map code itself, so the disk tier never serves pages rendered by older code.
+def cached_map_html(page, year, version, build, variant=None):
+    return map_html_cache.get_or_render((MAP_HTML_FORMAT, page, year, version, variant), lambda: render_map_html(build()))
+
+# Same output as streamlit_folium.folium_static, from already rendered HTML
+def show_map_html(html, width=700, height=500):
+    components.html(html, height=height + 10, width=width)
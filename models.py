@@ -0,0 +1,402 @@
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import joblib
+from joblib import Parallel, delayed
+import numpy as np
+import pandas as pd
+
+from data import RISK_FACTORS, RISK_LABELS, weighted_risk_score
+
+# Fitted models are persisted here, one file per (model, data version).
+# Retraining offline (python models.py retrain) replaces the file and every
+# running server picks the new one up on its next request. scikit-learn and
+# scipy are imported where a model is fitted, explained or tabulated, so pages
+# that only load the transaction scorer never import them.
+MODEL_REGISTRY_DIR = os.environ.get(
+    'MODEL_REGISTRY_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'models')
+)
+
+ANOMALY_FEATURES = ['percent_change', 'deforestation_impact', 'water_impact']
+
+TRANSACTION_FEATURES = ['frequency_pattern', 'structuring_pattern', 'unusual_pattern', 'official_risk']
+# Rows scored per predict call, and the probability above which a transaction is flagged
+TRANSACTION_SCORE_CHUNK = 1_000_000
+TRANSACTION_FLAG_PROBABILITY = 0.5
+# Rows sampled for the permutation importance computed at training time
+IMPORTANCE_SAMPLE_ROWS = 50_000
+
+# Training/scoring frame of the transaction classifier: the pattern features,
+# the official's risk score and is_suspicious, the generator's ground truth, as
+# the label. Not flag: that comes from the ml_score threshold, and once the
+# dashboard scores with this model, from the model itself.
+def transaction_training_frame(transactions, officials):
+    risk = officials.set_index('id')['risk_score']
+    return pd.DataFrame({
+        'frequency_pattern': transactions['frequency_pattern'].to_numpy(),
+        'structuring_pattern': transactions['structuring_pattern'].to_numpy(),
+        'unusual_pattern': transactions['unusual_pattern'].to_numpy(),
+        'official_risk': risk.reindex(transactions['official_id']).to_numpy(),
+        'is_suspicious': transactions['is_suspicious'].to_numpy(dtype=bool)
+    })
+
+def _fit_land_anomaly(land_change):
+    from sklearn.ensemble import IsolationForest
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    model = make_pipeline(StandardScaler(), IsolationForest(contamination=0.3, random_state=42))
+    return model.fit(land_change[ANOMALY_FEATURES])
+
+def _fit_risk_classifier(integrated_risk):
+    from sklearn.ensemble import RandomForestClassifier
+    X = integrated_risk[RISK_FACTORS].values
+    y = integrated_risk['risk_category'].map({label: i for i, label in enumerate(RISK_LABELS)}).values
+    return RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y)
+
+def _fit_transaction_classifier(frame):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    X = frame[TRANSACTION_FEATURES].to_numpy(dtype=float)
+    y = frame['is_suspicious'].to_numpy()
+    return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000)).fit(X, y)
+
+# The fitted classifier folded into a TransactionScorer: plain weights, so
+# loading it (on every page, to flag the transactions) needs no scikit-learn
+def _fit_transaction_scorer(frame):
+    return TransactionScorer(_fit_transaction_classifier(frame))
+
+def _explain_transaction_classifier(model, frame):
+    from sklearn.inspection import permutation_importance
+    sample = frame.sample(min(len(frame), IMPORTANCE_SAMPLE_ROWS), random_state=42)
+    result = permutation_importance(
+        model, sample[TRANSACTION_FEATURES].to_numpy(dtype=float), sample['is_suspicious'].to_numpy(),
+        n_repeats=5, random_state=42
+    )
+    return dict(zip(TRANSACTION_FEATURES, result.importances_mean.tolist()))
+
+# name -> (features, fit function taking the training frame)
+MODEL_SPECS = {
+    'land_anomaly': (ANOMALY_FEATURES, _fit_land_anomaly),
+    'risk_classifier': (RISK_FACTORS, _fit_risk_classifier),
+    'transaction_classifier': (TRANSACTION_FEATURES, _fit_transaction_classifier),
+    'transaction_scorer': (TRANSACTION_FEATURES, _fit_transaction_scorer),
+}
+# name -> function(model, frame) returning per-feature importance, computed
+# once at training time and stored with the model's metadata
+MODEL_EXPLAINERS = {
+    'transaction_classifier': _explain_transaction_classifier,
+}
+
+def feature_schema_hash(frame, features):
+    schema = [(feature, str(frame[feature].dtype)) for feature in features]
+    return hashlib.sha256(json.dumps(schema).encode('utf-8')).hexdigest()[:16]
+
+class ModelRegistry:
+    def __init__(self, directory=MODEL_REGISTRY_DIR):
+        self.directory = directory
+        # (name, version) -> (file mtime, model, meta). meta['revision'] is the
+        # file's mtime in ns (the training time when it could not be written),
+        # so caches keyed on it follow every retrain, even within one second
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name, version):
+        digest = hashlib.sha256(version.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.directory, name, f"{digest}.joblib")
+
+    def train(self, name, version, frame):
+        features, fit = MODEL_SPECS[name]
+        start = datetime.now()
+        model = fit(frame)
+        meta = {
+            'name': name,
+            'data_version': version,
+            'features': features,
+            'feature_schema': feature_schema_hash(frame, features),
+            'n_samples': len(frame),
+            'params': model.get_params(deep=False) if hasattr(model, 'get_params') else {},
+            'trained_at': start.isoformat(timespec='seconds'),
+            'fit_seconds': (datetime.now() - start).total_seconds()
+        }
+        if name in MODEL_EXPLAINERS:
+            meta['importance'] = MODEL_EXPLAINERS[name](model, frame)
+        path = self._path(name, version)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            joblib.dump({'model': model, 'meta': meta}, path + '.tmp')
+            os.replace(path + '.tmp', path)
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        meta = dict(meta, revision=mtime if mtime is not None else time.time_ns())
+        with self._lock:
+            self._loaded[(name, version)] = (mtime, model, meta)
+        return model, meta
+
+    # Fitted model and its metadata for this data version: from memory, else
+    # from disk (lazily, and again whenever the file is replaced), else trained
+    # on frame. A stored model whose feature schema no longer matches frame is
+    # retrained. frame may be a function returning the frame, so a memory hit
+    # never builds it.
+    def get(self, name, version, frame):
+        features = MODEL_SPECS[name][0]
+        path = self._path(name, version)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        with self._lock:
+            loaded = self._loaded.get((name, version))
+        if loaded is not None and (mtime is None or loaded[0] == mtime):
+            return loaded[1], loaded[2]
+        if callable(frame):
+            frame = frame()
+        if mtime is not None:
+            try:
+                stored = joblib.load(path)
+            except Exception:
+                stored = None
+            if stored is not None and stored['meta']['feature_schema'] == feature_schema_hash(frame, features):
+                meta = dict(stored['meta'], revision=mtime)
+                with self._lock:
+                    self._loaded[(name, version)] = (mtime, stored['model'], meta)
+                return stored['model'], meta
+        return self.train(name, version, frame)
+
+model_registry = ModelRegistry()
+
+def get_model(name, version, frame):
+    return model_registry.get(name, version, frame)
+
+# Grid spacing of the precomputed what-if surface; slider values in between
+# are linearly interpolated
+WHATIF_GRID_STEP = 0.05
+WHATIF_BATCH_SIZE = 50_000
+
+# Effect of each intervention on the risk factors
+INTERVENTION_EFFECTS = {
+    "Audit Keuangan Menyeluruh": {'financial': -0.3, 'transaction': -0.2},
+    "Verifikasi Izin Tambang": {'land': -0.25, 'official': -0.1},
+    "Investigasi Pejabat Terkait": {'official': -0.4, 'transaction': -0.2},
+    "Pemantauan Transaksi": {'transaction': -0.35},
+    "Evaluasi Dampak Lingkungan": {'land': -0.3}
+}
+EFFECT_FACTORS = {
+    'land': 'land_change_risk',
+    'financial': 'financial_risk',
+    'official': 'official_risk',
+    'transaction': 'transaction_risk'
+}
+
+# predict_proba over all RISK_LABELS, even if a class was absent when training
+def risk_proba(model, X):
+    X = np.asarray(X, dtype=float).reshape(-1, len(RISK_FACTORS))
+    proba = np.zeros((len(X), len(RISK_LABELS)))
+    for start in range(0, len(X), WHATIF_BATCH_SIZE):
+        proba[start:start + WHATIF_BATCH_SIZE, model.classes_] = model.predict_proba(X[start:start + WHATIF_BATCH_SIZE])
+    return proba
+
+# Class probabilities of the risk classifier over a regular grid of the four
+# risk factors, scored in one batch; lookups interpolate between grid points
+class RiskSurface:
+    def __init__(self, model, step=WHATIF_GRID_STEP):
+        from scipy.interpolate import RegularGridInterpolator
+        self.axis = np.linspace(0.0, 1.0, int(round(1 / step)) + 1)
+        grid = np.stack(np.meshgrid(*[self.axis] * len(RISK_FACTORS), indexing='ij'), axis=-1)
+        self.proba = risk_proba(model, grid.reshape(-1, len(RISK_FACTORS))).reshape(grid.shape[:-1] + (len(RISK_LABELS),))
+        self._interpolator = RegularGridInterpolator([self.axis] * len(RISK_FACTORS), self.proba)
+
+    # factors: (..., 4) in RISK_FACTORS order -> probabilities (..., 3)
+    def lookup(self, factors):
+        factors = np.clip(np.asarray(factors, dtype=float), 0.0, 1.0)
+        return self._interpolator(factors.reshape(-1, len(RISK_FACTORS))).reshape(factors.shape[:-1] + (len(RISK_LABELS),))
+
+    def predict(self, factors):
+        return np.asarray(RISK_LABELS)[self.lookup(factors).argmax(axis=-1)]
+
+_surfaces = {}
+_surfaces_lock = threading.Lock()
+
+# One surface per model revision and grid step
+def risk_surface(model, meta, step=WHATIF_GRID_STEP):
+    key = (meta['name'], meta['data_version'], meta['revision'], step)
+    with _surfaces_lock:
+        surface = _surfaces.get(key)
+    if surface is None:
+        surface = RiskSurface(model, step)
+        with _surfaces_lock:
+            for stale in [k for k in _surfaces if k[:2] == key[:2]]:
+                del _surfaces[stale]
+            _surfaces[key] = surface
+    return surface
+
+# Cost of each intervention, in juta Rupiah per mine
+INTERVENTION_COSTS = {
+    "Audit Keuangan Menyeluruh": 500,
+    "Verifikasi Izin Tambang": 200,
+    "Investigasi Pejabat Terkait": 400,
+    "Pemantauan Transaksi": 150,
+    "Evaluasi Dampak Lingkungan": 300
+}
+PORTFOLIO_CHUNK_SIZE = 20_000
+
+def intervention_effect_matrix(effects=INTERVENTION_EFFECTS):
+    return np.array([[effect.get(key, 0.0) for key in EFFECT_FACTORS] for effect in effects.values()])
+
+# (2^k, k) boolean matrix of every subset of k interventions; row 0 is the empty set
+def bundle_membership(n_interventions):
+    return ((np.arange(2 ** n_interventions)[:, None] >> np.arange(n_interventions)) & 1).astype(bool)
+
+# Risk factors after each bundle: (..., 4) factors -> (..., bundles, 4). The
+# effects only lower risk, so clamping the summed deltas at zero matches
+# applying them one at a time with max(0, ...).
+def apply_interventions(factors, membership, effects=INTERVENTION_EFFECTS):
+    deltas = membership @ intervention_effect_matrix(effects)
+    return np.maximum(0.0, np.asarray(factors, dtype=float)[..., None, :] + deltas)
+
+# Scores every subset of the interventions for one mine in a single batch
+def score_intervention_bundles(model, factors, effects=INTERVENTION_EFFECTS):
+    names = list(effects)
+    membership = bundle_membership(len(names))
+    post = apply_interventions(factors, membership, effects)
+    proba = risk_proba(model, post)
+    bundles = pd.DataFrame(post, columns=RISK_FACTORS)
+    bundles.insert(0, 'interventions', [tuple(name for name, used in zip(names, row) if used) for row in membership])
+    bundles.insert(1, 'n_interventions', membership.sum(axis=1))
+    bundles['integrated_risk_score'] = weighted_risk_score(bundles)
+    bundles['predicted_category'] = np.asarray(RISK_LABELS)[proba.argmax(axis=1)]
+    for i, label in enumerate(RISK_LABELS):
+        bundles[f'p_{label.lower()}'] = proba[:, i]
+    return bundles.sort_values(['p_tinggi', 'integrated_risk_score', 'n_interventions']).reset_index(drop=True)
+
+# P(Tinggi) of every mine under every bundle, (mines, bundles). Chunks of mines
+# are scored in parallel; the tree ensembles release the GIL while predicting,
+# so threads are enough unless backend='loky' is asked for.
+def portfolio_bundle_scores(model, integrated_risk, effects=INTERVENTION_EFFECTS, n_jobs=-1, backend='threading'):
+    membership = bundle_membership(len(effects))
+    factors = integrated_risk[RISK_FACTORS].to_numpy(dtype=float)
+    chunk = max(1, PORTFOLIO_CHUNK_SIZE // len(membership))
+    high = RISK_LABELS.index('Tinggi')
+    scored = Parallel(n_jobs=n_jobs, backend=backend)(
+        delayed(risk_proba)(model, apply_interventions(factors[start:start + chunk], membership, effects))
+        for start in range(0, len(factors), chunk)
+    )
+    p_high = np.concatenate([proba[:, high] for proba in scored]) if scored else np.empty(0)
+    return membership, p_high.reshape(len(factors), len(membership))
+
+_portfolio_scores = {}
+
+# Bundle scores per model revision; only the budget search reruns when the budget changes
+def portfolio_scores(model, meta, integrated_risk, effects=INTERVENTION_EFFECTS):
+    key = (meta['name'], meta['data_version'], meta['revision'], tuple(effects))
+    with _surfaces_lock:
+        scores = _portfolio_scores.get(key)
+    if scores is None:
+        scores = portfolio_bundle_scores(model, integrated_risk, effects)
+        with _surfaces_lock:
+            _portfolio_scores.clear()
+            _portfolio_scores[key] = scores
+    return scores
+
+# Multiple-choice knapsack over (mine, bundle): each mine gets one bundle, the
+# total cost stays within budget and the expected number of 'Tinggi' mines
+# (sum of P(Tinggi)) drops as much as possible. Solved by bisecting the
+# Lagrange multiplier of the budget, then spending what is left on the
+# cheapest-per-gain upgrades between the two bracketing allocations.
+def allocate_interventions(membership, p_high, budget, costs=INTERVENTION_COSTS, iterations=60):
+    bundle_cost = membership @ np.array(list(costs.values()), dtype=float)
+    gain = p_high[:, :1] - p_high
+
+    def choose(multiplier):
+        return np.argmax(gain - multiplier * bundle_cost, axis=1)
+
+    choice = choose(0.0)
+    if bundle_cost[choice].sum() <= budget:
+        return choice
+    low, high = 0.0, max(gain.max(), 0.0) / bundle_cost[bundle_cost > 0].min() + 1.0
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        if bundle_cost[choose(middle)].sum() > budget:
+            low = middle
+        else:
+            high = middle
+    choice, over = choose(high), choose(low)
+    upgrade = np.flatnonzero(choice != over)
+    if len(upgrade):
+        extra_cost = bundle_cost[over[upgrade]] - bundle_cost[choice[upgrade]]
+        extra_gain = gain[upgrade, over[upgrade]] - gain[upgrade, choice[upgrade]]
+        order = np.argsort(-extra_gain / np.maximum(extra_cost, 1e-12))
+        fits = np.cumsum(extra_cost[order]) <= budget - bundle_cost[choice].sum()
+        choice[upgrade[order[fits]]] = over[upgrade[order[fits]]]
+    return choice
+
+# Budget-constrained intervention plan for the whole portfolio, one row per mine
+def optimize_interventions(model, integrated_risk, budget, costs=INTERVENTION_COSTS, effects=INTERVENTION_EFFECTS,
+                           scores=None, n_jobs=-1, backend='threading'):
+    membership, p_high = scores if scores is not None else portfolio_bundle_scores(
+        model, integrated_risk, effects, n_jobs, backend
+    )
+    choice = allocate_interventions(membership, p_high, budget, costs)
+    names = np.array(list(effects), dtype=object)
+    rows = np.arange(len(choice))
+    return pd.DataFrame({
+        'mine_id': integrated_risk['mine_id'].to_numpy(),
+        'mine_name': integrated_risk['mine_name'].to_numpy(),
+        'interventions': [tuple(names[membership[bundle]]) for bundle in choice],
+        'cost': membership[choice] @ np.array(list(costs.values()), dtype=float),
+        'p_tinggi_before': p_high[:, 0],
+        'p_tinggi_after': p_high[rows, choice]
+    }).assign(reduction=lambda plan: plan['p_tinggi_before'] - plan['p_tinggi_after'])
+
+# The fitted scaler + logistic regression folded into one weight vector:
+# batches are a chunked matrix product, single transactions a plain dot product
+class TransactionScorer:
+    def __init__(self, model):
+        scaler, classifier = model[0], model[-1]
+        self.weights = classifier.coef_[0] / scaler.scale_
+        self.bias = float(classifier.intercept_[0] - np.dot(classifier.coef_[0], scaler.mean_ / scaler.scale_))
+        self._weights = self.weights.tolist()
+
+    # P(Suspicious) for an (n, 4) array in TRANSACTION_FEATURES order
+    def predict_proba(self, X, chunk_size=TRANSACTION_SCORE_CHUNK):
+        X = np.asarray(X)
+        proba = np.empty(len(X))
+        for start in range(0, len(X), chunk_size):
+            logit = X[start:start + chunk_size] @ self.weights + self.bias
+            proba[start:start + chunk_size] = 1.0 / (1.0 + np.exp(-logit))
+        return proba
+
+    # Fast path for one transaction: no array allocation or input validation
+    def score_one(self, frequency_pattern, structuring_pattern, unusual_pattern, official_risk):
+        logit = self.bias + (
+            self._weights[0] * frequency_pattern + self._weights[1] * structuring_pattern
+            + self._weights[2] * unusual_pattern + self._weights[3] * official_risk
+        )
+        return 1.0 / (1.0 + math.exp(-logit))
+
+    def flag(self, X):
+        return np.where(self.predict_proba(X) > TRANSACTION_FLAG_PROBABILITY, 'Suspicious', 'Normal').astype(object)
+
+# Offline retraining: python models.py retrain [name ...]
+if __name__ == '__main__':
+    if sys.argv[1:2] != ['retrain']:
+        sys.exit("usage: python models.py retrain [model ...]")
+    from data import get_data, data_version
+    _, _, officials, transactions, _, land_change, integrated_risk = get_data()
+    transaction_frame = transaction_training_frame(transactions, officials)
+    frames = {
+        'land_anomaly': land_change,
+        'risk_classifier': integrated_risk,
+        'transaction_classifier': transaction_frame,
+        'transaction_scorer': transaction_frame
+    }
+    for name in sys.argv[2:] or MODEL_SPECS:
+        _, meta = model_registry.train(name, data_version(), frames[name])
+        print(f"{name}: trained on {meta['n_samples']} rows in {meta['fit_seconds']:.2f} s ({meta['data_version']})")
@@ -0,0 +1,102 @@
+import ipaddress
+import os
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local endpoint serving viewport-clipped GeoJSON to the folium maps. It is
+# only used when TILE_SERVER_URL (with a {port} placeholder) says where the
+# browser can reach it, e.g. http://localhost:{port} when the browser runs on
+# the server; deployments that expose only the Streamlit port leave it unset.
+TILE_SERVER_URL = os.environ.get('TILE_SERVER_URL')
+TILE_SERVER_PORT = int(os.environ.get('TILE_SERVER_PORT', '8765'))
+# Bound to loopback; another host has to be allowed with TILE_SERVER_EXPOSE=1
+TILE_SERVER_HOST = os.environ.get('TILE_SERVER_HOST', '127.0.0.1')
+TILE_SERVER_EXPOSE = os.environ.get('TILE_SERVER_EXPOSE') == '1'
+# Layers carry data the app keeps behind its login, so their paths start with
+# a token that is new in every process and only ever handed out in map pages
+_LAYER_TOKEN = secrets.token_urlsafe(16)
+
+def tile_server_enabled():
+    return bool(TILE_SERVER_URL)
+
+def _is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+# layer name -> provider(bbox, zoom) returning a GeoJSON string
+_layers = {}
+_layers_lock = threading.Lock()
+
+def register_layer(name, provider):
+    with _layers_lock:
+        _layers[f"{_LAYER_TOKEN}/{name}"] = provider
+
+def _parse_bbox(value):
+    min_lon, min_lat, max_lon, max_lat = (float(v) for v in value.split(','))
+    # Leaflet reports longitudes past +/-180 once the world wraps
+    return max(min_lon, -180.0), max(min_lat, -90.0), min(max_lon, 180.0), min(max_lat, 90.0)
+
+class _ViewportHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        with _layers_lock:
+            provider = _layers.get(url.path.strip('/'))
+        if provider is None:
+            self.send_error(404, "Unknown layer")
+            return
+        params = parse_qs(url.query)
+        try:
+            bbox = _parse_bbox(params['bbox'][0])
+            zoom = int(float(params.get('zoom', ['0'])[0]))
+        except (KeyError, ValueError):
+            self.send_error(400, "Expected bbox=min_lon,min_lat,max_lon,max_lat&zoom=z")
+            return
+        # A failing provider answers 500 instead of dropping the connection
+        try:
+            body = provider(bbox, zoom).encode('utf-8')
+        except Exception as e:
+            self.send_error(500, f"Layer failed: {type(e).__name__}")
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/geo+json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        # The path carries the data version (and this process's token), so
+        # responses never go stale; only the browser keeps them
+        self.send_header('Cache-Control', 'private, max-age=3600')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_server = None
+
+# One server per process, started on first use. Falls back to a free port if
+# the configured one is taken (e.g. by another worker).
+def start_tile_server(host=TILE_SERVER_HOST, port=TILE_SERVER_PORT):
+    global _server
+    if not (_is_loopback(host) or TILE_SERVER_EXPOSE):
+        raise ValueError(f"Tile server host {host} is not loopback; set TILE_SERVER_EXPOSE=1 to serve on it")
+    with _layers_lock:
+        if _server is None:
+            try:
+                server = ThreadingHTTPServer((host, port), _ViewportHandler)
+            except OSError:
+                server = ThreadingHTTPServer((host, 0), _ViewportHandler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name='tile-server', daemon=True).start()
+            _server = server
+    return _server
+
+def _base_url(server):
+    return TILE_SERVER_URL.format(port=server.server_address[1]).rstrip('/')
+
+def layer_url(server, name):
+    return f"{_base_url(server)}/{_LAYER_TOKEN}/{name}"